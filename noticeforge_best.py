@@ -5,9 +5,15 @@ NoticeForge Core Logic v6.0 (Ultimate: 法令・通知・マニュアル3層対
   v5.4: OCR品質スコア・構造化概要・改廃追跡・法令抽出・時系列ソート・差分レポート
 """
 from __future__ import annotations
-import os, sys, re, json, time, hashlib, csv, subprocess, shutil, html as _html
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Tuple, Optional, Callable
+import os, sys, re, io, json, time, hashlib, mmap, csv, subprocess, shutil, tempfile, threading, html as _html
+from dataclasses import dataclass
+from collections import Counter, deque
+from functools import lru_cache
+from itertools import chain, islice
+from stat import S_ISREG
+from datetime import date as _date, datetime as _datetime
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from typing import Dict, List, Tuple, Optional, Callable, Iterable, Iterator
 
 # キャッシュバージョン: 概要生成ロジックを変更した場合はインクリメントする
 # → 古いキャッシュの概要が新ロジックと不整合になるのを防止
@@ -20,59 +26,184 @@ _TESSERACT_CANDIDATES = [
     r"C:\Users\Public\Tesseract-OCR\tesseract.exe",
 ]
 
-try:
-    import fitz  # PyMuPDF
-except Exception:
-    fitz = None
+# ── 重い抽出ライブラリの遅延読み込み ──
+# PyMuPDF / Tesseract / python-docx / openpyxl / xlrd は import だけで数百msかかる。
+# 該当形式のファイルを初めて処理するときに読み込み、結果（未インストールなら None）をキャッシュする。
+@lru_cache(maxsize=None)
+def _load_fitz():
+    try:
+        import fitz  # PyMuPDF
+        return fitz
+    except Exception:
+        return None
 
-TESSERACT_AVAILABLE = False
-try:
-    import pytesseract
+@lru_cache(maxsize=None)
+def _load_tesseract():
+    """OCRが使えれば (pytesseract, PIL.Image) を返す。使えなければ None"""
+    try:
+        import pytesseract
+        from PIL import Image
+        # バイナリを自動検出（インストール場所が異なる環境に対応）
+        found: Optional[str] = None
+        for tc in _TESSERACT_CANDIDATES:
+            if os.path.isfile(tc):
+                found = tc
+                break
+        if found is None:
+            # PATH上にある場合（Linux / Mac / PATH追加済みのWindows）
+            if shutil.which("tesseract"):
+                found = "tesseract"
+        if found:
+            pytesseract.pytesseract.tesseract_cmd = found
+            return pytesseract, Image
+    except Exception:
+        pass
+    return None
+
+@lru_cache(maxsize=None)
+def _load_tesserocr():
+    """tesserocr と日本語モデルが使えれば (tesserocr, PyTessBaseAPI の引数) を返す。使えなければ None
+    pytesseract はページごとに tesseract.exe を起動して言語データを読み直すため、
+    プロセス内APIを使い回せる場合はこちらを優先する。"""
+    try:
+        import tesserocr
+        kwargs = {"lang": "jpn"}
+        # Windows のインストール先に tessdata があればそれを使う（なければ TESSDATA_PREFIX / 既定値）
+        for tc in _TESSERACT_CANDIDATES:
+            tessdata = os.path.join(os.path.dirname(tc), "tessdata")
+            if os.path.isdir(tessdata):
+                kwargs["path"] = tessdata + os.sep
+                break
+        _, langs = tesserocr.get_languages(kwargs.get("path", ""))
+        if "jpn" in langs:
+            return tesserocr, kwargs
+    except Exception:
+        pass
+    return None
+
+def _ocr_available() -> bool:
+    return _load_tesserocr() is not None or _load_tesseract() is not None
+
+# OCRワーカースレッドごとの PyTessBaseAPI（インスタンスはスレッドセーフでないため共有しない）
+_OCR_THREAD_LOCAL = threading.local()
+
+# ── OCR用の画像化解像度 ──
+# まず 150dpi グレースケールで認識し（印刷された日本語文書ならほぼこれで足りる）、
+# 結果が極端に短いか平均信頼度が低いページだけ 220dpi で読み直す。
+_OCR_DPI = 150
+_OCR_DPI_RETRY = 220
+_OCR_RETRY_MIN_CHARS = 20
+_OCR_RETRY_MIN_CONF = 65
+# 白紙判定: 明るさがこの値未満の画素を「インク」とみなし、その割合がこれ以下なら白紙（区切り紙・裏面等）
+_OCR_BLANK_INK_LEVEL = 200
+_OCR_BLANK_MAX_INK_RATIO = 0.001
+_OCR_LIGHT_BYTES = bytes(range(_OCR_BLANK_INK_LEVEL, 256))
+
+def _ocr_image(img, dpi: int = _OCR_DPI) -> Tuple[str, Optional[int]]:
+    """PIL画像を日本語OCRする（tesserocr優先、なければ pytesseract）
+    (認識テキスト, 平均信頼度) を返す。pytesseract では信頼度は取れないので None。"""
+    tess = _load_tesserocr()
+    if tess is not None:
+        api = getattr(_OCR_THREAD_LOCAL, "api", None)
+        if api is None:
+            tesserocr, kwargs = tess
+            api = _OCR_THREAD_LOCAL.api = tesserocr.PyTessBaseAPI(**kwargs)
+        api.SetImage(img)
+        api.SetVariable("user_defined_dpi", str(dpi))
+        return api.GetUTF8Text(), api.MeanTextConf()
+    pytesseract, _ = _load_tesseract()
+    return pytesseract.image_to_string(img, lang="jpn", config=f"--dpi {dpi}"), None
+
+def _ocr_needs_retry(text: str, conf: Optional[int]) -> bool:
+    """低解像度での認識結果が不十分で、高解像度で読み直すべきか"""
+    if len(text.strip()) < _OCR_RETRY_MIN_CHARS:
+        return True
+    return conf is not None and conf < _OCR_RETRY_MIN_CONF
+
+def _is_blank_pixmap(pix) -> bool:
+    """グレースケールのピクセルマップがほぼ白紙か（高解像度で読み直しても文字は出てこない）"""
+    if pix.is_unicolor:
+        return True
+    # 明るい画素をバイト列から取り除き、残った（インクの）画素数を数える
+    ink = len(pix.samples_mv.tobytes().translate(None, _OCR_LIGHT_BYTES))
+    return ink <= pix.width * pix.height * _OCR_BLANK_MAX_INK_RATIO
+
+def _render_ocr_image(fitz, page, dpi: int):
+    """PDFページをOCR用のグレースケール画像にする（RGBの1/3のデータ量）
+    画像はピクセルマップのメモリをコピーせずに共有するため、(画像, ピクセルマップ) の組で返す。
+    ピクセルマップは画像の認識が終わるまで、PDFを処理しているスレッドで保持・解放すること。"""
     from PIL import Image
-    # バイナリを自動検出（インストール場所が異なる環境に対応）
-    _found_tesseract: Optional[str] = None
-    for _tc in _TESSERACT_CANDIDATES:
-        if os.path.isfile(_tc):
-            _found_tesseract = _tc
-            break
-    if _found_tesseract is None:
-        # PATH上にある場合（Linux / Mac / PATH追加済みのWindows）
-        import shutil as _shutil
-        if _shutil.which("tesseract"):
-            _found_tesseract = "tesseract"
-    if _found_tesseract:
-        pytesseract.pytesseract.tesseract_cmd = _found_tesseract
-        TESSERACT_AVAILABLE = True
-except Exception:
-    TESSERACT_AVAILABLE = False
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    img = Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+    return img, pix
+
+# OCR認識は tesserocr ならGILを解放したC++処理、pytesseract なら別プロセスの tesseract なので、
+# スレッドでもコア数まで並列に動く（プロセスプールにすると画像の受け渡しと言語モデルの読込がプロセスごとに増える）
+# ※ スレッドごとに言語モデルを保持するので、メモリを考えて上限は8
+_OCR_WORKERS = max(1, min(os.cpu_count() or 1, 8))
+
+@lru_cache(maxsize=None)
+def _ocr_pool() -> ThreadPoolExecutor:
+    """ページOCR用のスレッドプール（初回のOCRで作成し、以降のPDFでも使い回す）
+    スレッドを使い回すことで、スレッドごとの tesserocr の言語モデル読込も1回で済む。"""
+    # tesseract 内部の OpenMP 並列とスレッド並列が重なって過剰にスレッドが立たないようにする
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    return ThreadPoolExecutor(max_workers=_OCR_WORKERS, thread_name_prefix="ocr")
+
+@lru_cache(maxsize=None)
+def _load_docx_document():
+    try:
+        from docx import Document
+        return Document
+    except Exception:
+        return None
 
-try:
-    from docx import Document
-except Exception:
-    Document = None
+@lru_cache(maxsize=None)
+def _load_openpyxl():
+    try:
+        import openpyxl
+        return openpyxl
+    except Exception:
+        return None
 
-try:
-    import openpyxl
-    from openpyxl.styles import Font, Alignment, PatternFill
-    from openpyxl.utils import get_column_letter
-except Exception:
-    openpyxl = None
+@lru_cache(maxsize=None)
+def _load_calamine():
+    """python-calamine（Rust製の高速Excelリーダー）があれば返す。なければ openpyxl で読む"""
+    try:
+        import python_calamine
+        return python_calamine
+    except Exception:
+        return None
+
+@lru_cache(maxsize=None)
+def _load_xlrd():
+    try:
+        import xlrd
+        return xlrd
+    except Exception:
+        return None
+
+# 拡張子 → 抽出に使うライブラリ（ログ表示用）
+_EXTRACTOR_LIBS: Dict[str, str] = {
+    ".pdf": "PyMuPDF", ".docx": "python-docx",
+    ".xlsx": "openpyxl", ".xlsm": "openpyxl", ".xls": "xlrd",
+    ".xdw": "DocuWorks", ".xbd": "DocuWorks",
+}
 
 try:
-    import xlrd
+    import orjson  # マニフェストの高速な読み書き（未インストールなら標準jsonを使う）
 except Exception:
-    xlrd = None
+    orjson = None
 
-def _setup_xdw_dll_path():
-    """XDWAPI.dllのディレクトリをPythonのDLL検索パスに追加する。"""
+def _find_xdw_dll_dirs() -> List[str]:
+    """XDWAPI.dll があるディレクトリをレジストリ・既定のインストール先から探す。"""
+    dll_dirs: List[str] = []
     if not sys.platform.startswith("win"):
-        return
+        return dll_dirs
     try:
         import winreg
         import glob as _glob
 
-        dll_dirs: List[str] = []
-
         def _add_if_has_dll(base: str):
             if not base:
                 return
@@ -173,8 +304,14 @@ def _setup_xdw_dll_path():
                 d = os.path.dirname(pattern)
                 if d not in dll_dirs:
                     dll_dirs.append(d)
+    except Exception:
+        pass
+    return dll_dirs
 
-        for d in dll_dirs:
+def _setup_xdw_dll_path(dll_dirs: List[str]):
+    """XDWAPI.dllのディレクトリをPythonのDLL検索パスに追加する。"""
+    for d in dll_dirs:
+        try:
             if hasattr(os, "add_dll_directory"):
                 try:
                     os.add_dll_directory(d)
@@ -183,20 +320,19 @@ def _setup_xdw_dll_path():
             cur_path = os.environ.get("PATH", "")
             if d.lower() not in cur_path.lower():
                 os.environ["PATH"] = d + os.pathsep + cur_path
-    except Exception:
-        pass
-
-_setup_xdw_dll_path()
+        except Exception:
+            pass
 
-try:
-    import xdwlib
-    XDWLIB_AVAILABLE = True
-except Exception:
-    XDWLIB_AVAILABLE = False
 _WIN_NO_CONSOLE: dict = (
     {"creationflags": 0x08000000} if sys.platform.startswith("win") else {}
 )
 
+def _existing_tool_candidates(candidates: List[str]) -> List[str]:
+    """候補のうち実在するファイルだけを順序どおり（重複なし）に残す。
+    存在しないパスを subprocess で試すとファイルごとに起動失敗を繰り返すため、探索時に1回だけ確認する。
+    PATH から探す素の名前（"xdw2text" 等）はそのまま残す。"""
+    return [c for c in dict.fromkeys(candidates) if not os.path.isabs(c) or os.path.isfile(c)]
+
 def _build_xdw2text_candidates() -> List[str]:
     """xdw2text.exeの候補パスを構築する。"""
     candidates: List[str] = ["xdw2text"]
@@ -281,10 +417,8 @@ def _build_xdw2text_candidates() -> List[str]:
             r"C:\Program Files (x86)\FUJIFILM\DocuWorks Viewer Light 10\xdw2text.exe",
             r"C:\Program Files (x86)\FUJIFILM\DocuWorks Viewer Light 10\bin\xdw2text.exe",
         ]
-    return candidates
+    return _existing_tool_candidates(candidates)
 
-# 起動時に候補リストを構築（レジストリも参照）
-XDW2TEXT_CANDIDATES = _build_xdw2text_candidates()
 # 一度見つかった実行ファイルのパスをキャッシュ（ファイルごとに7回試行しなくて済む）
 _XDW2TEXT_PATH: Optional[str] = None
 
@@ -313,10 +447,91 @@ def _build_xdoc2txt_candidates() -> List[str]:
             r"C:\Program Files\xdoc2txt\xdoc2txt.exe",
             r"C:\Program Files (x86)\xdoc2txt\xdoc2txt.exe",
         ]
-    return candidates
+    return _existing_tool_candidates(candidates)
 
-XDOC2TXT_CANDIDATES = _build_xdoc2txt_candidates()
 _XDOC2TXT_PATH: Optional[str] = None
+# xdoc2txt に渡すオプションの試行順（-i: iFilter 経由）。成功したものを先頭に並べ替えて次回以降の無駄な起動を省く
+_XDOC2TXT_OPTS: Tuple[Tuple[str, ...], ...] = (("-i",), ())
+
+def _run_text_tool(args: List[str]) -> Tuple[int, str]:
+    """外部のテキスト抽出ツールを実行し (終了コード, 標準出力) を返す。
+    出力はバイト列のまま受け取り、最後に一度だけ CP932 でデコードする（改行は text=True と同じく \n に揃える）。"""
+    result = subprocess.run(
+        args,
+        capture_output=True,
+        timeout=30,
+        **_WIN_NO_CONSOLE,   # ← Windowsのコンソールウィンドウを非表示
+    )
+    out = result.stdout.decode("cp932", errors="ignore")
+    if "\r" in out:
+        out = out.replace("\r\n", "\n").replace("\r", "\n")
+    return result.returncode, out
+
+# ── DocuWorks関連ツールの探索結果のディスクキャッシュ ──
+# レジストリ走査と Program Files 配下の glob はウイルス対策ソフト等の影響で数百msかかるため、
+# 探索結果を一時フォルダに保存し、次回起動時はインストール先フォルダの更新日時が同じで、
+# 見つかっていたファイルがすべて残っていれば走査を省略する。
+_XDW_TOOL_CACHE_PATH = os.path.join(tempfile.gettempdir(), "noticeforge_xdw_cache.json")
+_XDW_TOOL_CACHE_VERSION = 2
+
+def _xdw_scan_fingerprint() -> str:
+    """インストール先フォルダの更新日時（新しいソフトの追加・削除で変わる）"""
+    dirs = [os.path.join(root, sub) if sub else root
+            for root in (r"C:\Program Files", r"C:\Program Files (x86)")
+            for sub in ("", "FUJIFILM", "Fuji Xerox", "xdoc2txt")]
+    dirs += [r"C:\tools", r"C:\xdoc2txt"]  # xdoc2txt の手動配置先
+    parts: List[str] = []
+    for d in dirs:
+        try:
+            parts.append(f"{d}={os.stat(d).st_mtime_ns}")
+        except OSError:
+            continue
+    return "|".join(parts)
+
+def _discover_xdw_tools() -> Dict[str, List[str]]:
+    """XDWAPI.dll のディレクトリ・xdw2text / xdoc2txt の候補を返す（Windows ではキャッシュを使う）"""
+    if not sys.platform.startswith("win"):
+        return {"dll_dirs": [], "xdw2text": _build_xdw2text_candidates(),
+                "xdoc2txt": _build_xdoc2txt_candidates()}
+    key = _xdw_scan_fingerprint()
+    try:
+        with open(_XDW_TOOL_CACHE_PATH, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if (cached.get("version") == _XDW_TOOL_CACHE_VERSION and cached.get("key") == key
+                and all(os.path.exists(p) for p in cached["found"])):
+            return cached["tools"]
+    except Exception:
+        pass  # キャッシュなし・破損・無効 → 走査し直す
+
+    tools = {"dll_dirs": _find_xdw_dll_dirs(), "xdw2text": _build_xdw2text_candidates(),
+             "xdoc2txt": _build_xdoc2txt_candidates()}
+    # 走査時点で実在したパス（キャッシュ利用時にこれが消えていたら再走査する）
+    found = [p for p in tools["dll_dirs"] + tools["xdw2text"] + tools["xdoc2txt"]
+             if os.path.isabs(p) and os.path.exists(p)]
+    try:
+        with open(_XDW_TOOL_CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump({"version": _XDW_TOOL_CACHE_VERSION, "key": key, "found": found, "tools": tools},
+                      f, ensure_ascii=False)
+    except Exception:
+        pass  # キャッシュ保存失敗は致命的ではない
+    return tools
+
+# DocuWorks の探索・DLL検索パスの設定・xdwlib の読み込みは、初めて .xdw/.xbd を処理するときまで遅らせる
+@lru_cache(maxsize=None)
+def _load_xdw_tools() -> Dict[str, List[str]]:
+    """DocuWorks関連ツールの探索結果（レジストリも参照）。初回呼び出し時に DLL 検索パスも設定する"""
+    tools = _discover_xdw_tools()
+    _setup_xdw_dll_path(tools["dll_dirs"])
+    return tools
+
+@lru_cache(maxsize=None)
+def _load_xdwlib():
+    _load_xdw_tools()  # xdwlib は import 時に XDWAPI.dll を読み込む
+    try:
+        import xdwlib
+        return xdwlib
+    except Exception:
+        return None
 
 DEFAULTS: Dict[str, object] = {
     "min_chars_mainbody": 400, # 基準を少し甘くして抽出漏れを防止
@@ -400,70 +615,189 @@ def get_safe_path(path: str) -> str:
         return "\\\\?\\" + abs_path
     return abs_path
 
+# 日本語文字間に挟まった不要な空白（PyMuPDF抽出・OCR結果の両方で発生する）
+_JP_SPACE_RE = re.compile(r'([ぁ-んァ-ン一-龥])[ \t]+([ぁ-んァ-ン一-龥])')
+_JP_SPACE_ANY_RE = re.compile(r'([ぁ-んァ-ン一-龥])\s+([ぁ-んァ-ン一-龥])')
+_MULTI_SPACE_RE = re.compile(r'[ \t]{2,}')
+
 def extract_pdf(path: str, use_ocr: bool) -> Tuple[str, Optional[int], str]:
+    fitz = _load_fitz()
     if not fitz: return "", None, "pymupdf_missing"
-    text_parts = []
+    ocr = _ocr_available()
+    # ページごとの断片リスト（抽出テキスト＋OCR結果）。連結は最後に1回だけ行う
+    page_fragments: List[List[str]] = []
     method = "pdf_text"
+    # 認識中の画像が共有しているピクセルマップ（Future → pix）。PyMuPDF のオブジェクトを別スレッドで
+    # 解放しないよう、OCRスレッドには画像だけを渡し、ピクセルマップは認識が終わってからこのスレッドで手放す
+    held_pix: Dict[Future, object] = {}
     try:
         doc = fitz.open(get_safe_path(path))
         pages = doc.page_count
+        # OCRが必要なページは画像化（PyMuPDFはスレッドセーフでないのでこのスレッドで行う）まで済ませ、
+        # 認識処理はスレッドプールで並行させる。結果はページ順に組み立て直す。
+        # 画像を溜め込みすぎないよう、同時に投入するページ数はワーカー数の2倍までに抑える。
+        pool = _ocr_pool() if ocr else None
+        ocr_jobs: Dict[int, Future] = {}
+        # 1回目の画像がほぼ白紙だったページ（認識結果が短くても読み直さない）
+        blank_pages: set = set()
+
+        def submit_ocr(jobs: Dict[int, Future], i: int, page, dpi: int) -> None:
+            pending = [f for f in jobs.values() if not f.done()]
+            if len(pending) >= _OCR_WORKERS * 2:
+                wait(pending, return_when=FIRST_COMPLETED)
+            # 認識が終わったページのピクセルマップはここで解放する（溜め込まない）
+            for f in [f for f in held_pix if f.done()]:
+                del held_pix[f]
+            img, pix = _render_ocr_image(fitz, page, dpi)
+            if dpi == _OCR_DPI and _is_blank_pixmap(pix):
+                blank_pages.add(i)
+            fut = pool.submit(_ocr_image, img, dpi)
+            held_pix[fut] = pix
+            jobs[i] = fut
+
         for i in range(pages):
             page = doc.load_page(i)
             page_text = page.get_text("text") or ""
             # PyMuPDF が日本語文字間にスペースを挿入する問題を修正
             # （行をまたぐ改行は残し、同一行内の不要スペースのみ除去）
             # 日本語文字間の不要スペースを除去（数字↔日本語間は箇条書き番号等で意味があるため除去しない）
-            page_text = re.sub(r'([ぁ-んァ-ン一-龥])[ \t]+([ぁ-んァ-ン一-龥])', r'\1\2', page_text)
+            # ※ ASCIIだけのページ（英文ページ等）は日本語を含まないので置換自体を省く
+            #   （str.isascii() は文字列の内部表現を見るだけで判定できる）
+            if not page_text.isascii():
+                page_text = _JP_SPACE_RE.sub(r'\1\2', page_text)
             # OCR判断:
             #   use_ocr=True → 50文字未満のページにOCR（手動指定モード）
             #   use_ocr=False → 10文字未満の極端に空なページにのみ自動OCR（画像PDF自動検出）
             ocr_trigger = 50 if use_ocr else 10
-            if len(page_text.strip()) < ocr_trigger and TESSERACT_AVAILABLE:
+            if len(page_text.strip()) < ocr_trigger and ocr:
+                try:
+                    submit_ocr(ocr_jobs, i, page, _OCR_DPI)
+                except Exception:
+                    pass
+            page_fragments.append([page_text])
+
+        # 1回目の結果を集め、不十分なページだけ高解像度で読み直す（画像化はこのスレッドで行うため doc はまだ閉じない）
+        ocr_results: Dict[int, str] = {}
+        retry_jobs: Dict[int, Future] = {}
+        for i, fut in ocr_jobs.items():
+            try:
+                ocr_text, conf = fut.result()
+            except Exception:
+                continue
+            finally:
+                held_pix.pop(fut, None)
+            ocr_results[i] = ocr_text
+            if i not in blank_pages and _ocr_needs_retry(ocr_text, conf):
                 try:
-                    pix = page.get_pixmap(dpi=200)
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    ocr_text = pytesseract.image_to_string(img, lang="jpn")
-                    # OCRテキストの日本語文字間スペースを除去
-                    ocr_text = re.sub(r'([ぁ-んァ-ン一-龥])\s+([ぁ-んァ-ン一-龥])', r'\1\2', ocr_text)
-                    if ocr_text.strip():
-                        # 完全に空だったページはOCR結果で置換、テキストがあった場合は追記
-                        page_text = ocr_text if len(page_text.strip()) < 10 else page_text + "\n" + ocr_text
-                        method = "pdf_ocr" if use_ocr else "pdf_ocr_auto"
+                    submit_ocr(retry_jobs, i, doc.load_page(i), _OCR_DPI_RETRY)
                 except Exception:
                     pass
-            text_parts.append(page_text)
+        for i, fut in retry_jobs.items():
+            try:
+                ocr_text, _ = fut.result()
+            except Exception:
+                continue
+            finally:
+                held_pix.pop(fut, None)
+            if ocr_text.strip():
+                ocr_results[i] = ocr_text
         doc.close()
-        return "\n".join(text_parts), pages, method
+
+        for i, ocr_text in ocr_results.items():
+            # OCRテキストの日本語文字間スペースを除去（改行をまたぐものも除去。ASCIIだけなら対象外）
+            if not ocr_text.isascii():
+                ocr_text = _JP_SPACE_ANY_RE.sub(r'\1\2', ocr_text)
+            if ocr_text.strip():
+                # 完全に空だったページはOCR結果で置換、テキストがあった場合は追記
+                frags = page_fragments[i]
+                if len(frags[0].strip()) < 10:
+                    frags[0] = ocr_text
+                else:
+                    frags.append(ocr_text)
+                method = "pdf_ocr" if use_ocr else "pdf_ocr_auto"
+        return "\n".join(chain.from_iterable(page_fragments)), pages, method
     except Exception as e:
         return "", None, f"pdf_err:{e.__class__.__name__}"
+    finally:
+        # 途中で例外になった場合も、認識中の画像のメモリを先に解放しないよう完了を待ってから手放す
+        if held_pix:
+            wait(list(held_pix))
+            held_pix.clear()
+
+# セル内の改行・タブは表の区切りを壊すので空白にする
+_CELL_TRANS = str.maketrans({"\n": " ", "\r": " ", "\t": " "})
 
 def extract_docx(path: str) -> Tuple[str, str]:
+    Document = _load_docx_document()
     if not Document: return "", "docx_missing"
     try:
         doc = Document(get_safe_path(path))
-        parts = [p.text for p in doc.paragraphs if p.text.strip()]
+        # 段落・表の行を部品リストに溜めずにバッファへ直接書き出す（区切りの改行は2件目以降の前に入れる）
+        buf = io.StringIO()
+        write = buf.write
+        sep = ""
+        for p in doc.paragraphs:
+            t = p.text
+            if t and not t.isspace():
+                write(sep); write(t)
+                sep = "\n"
+        trans = _CELL_TRANS
         for table in doc.tables:
             for row in table.rows:
-                cells = [cell.text.strip().replace("\n", " ") for cell in row.cells]
+                cells = [cell.text.translate(trans).strip() for cell in row.cells]
                 if any(cells):
-                    parts.append("| " + " | ".join(cells) + " |")
-        return "\n".join(parts), "docx_text"
+                    write(sep); write("| "); write(" | ".join(cells)); write(" |")
+                    sep = "\n"
+        return buf.getvalue(), "docx_text"
     except Exception as e:
         return "", f"docx_err:{e.__class__.__name__}"
 
+def _calamine_cell(c):
+    """calamine のセル値を openpyxl（data_only=True）で読んだときと同じ値に揃える
+    （空セル→None、整数値の数値→int、日付のみ→datetime）"""
+    if c == "":
+        return None
+    if isinstance(c, float) and c.is_integer() and abs(c) < 1e15:
+        return int(c)
+    if type(c) is _date:
+        return _datetime(c.year, c.month, c.day)
+    return c
+
 def extract_excel(path: str) -> Tuple[str, str]:
     """新旧エクセルを読み込み、AIが理解しやすいMarkdown表形式に整形する"""
     out = []
     ext = os.path.splitext(path)[1].lower()
     safe_p = get_safe_path(path)
+    # セル整形（最大 400行×40列×10シート）のループ内で属性参照しないよう束縛しておく
+    join = " | ".join
+    trans = _CELL_TRANS
     try:
-        if ext in (".xlsx", ".xlsm") and openpyxl:
+        calamine = _load_calamine() if ext in (".xlsx", ".xlsm") else None
+        openpyxl = _load_openpyxl() if ext in (".xlsx", ".xlsm") and not calamine else None
+        xlrd = _load_xlrd() if ext == ".xls" else None
+        if calamine:
+            wb = calamine.CalamineWorkbook.from_path(safe_p)
+            sheet_names = [m.name for m in wb.sheets_metadata
+                           if m.typ == calamine.SheetTypeEnum.WorkSheet]
+            for name in sheet_names[:10]:
+                out.append(f"## Sheet: {name}")
+                # openpyxl と同じく A1 起点・最大 400行×40列（空セルは40列まで埋める）で読む
+                rows = wb.get_sheet_by_name(name).to_python(skip_empty_area=False)
+                for row in rows[:400]:
+                    row = [_calamine_cell(c) for c in row[:40]]
+                    row += [None] * (40 - len(row))
+                    if any(row):
+                        out.append("| " + join([(c if c.__class__ is str else str(c)).translate(trans).strip() if c is not None else "" for c in row]) + " |")
+                out.append("")
+            wb.close()
+            return "\n".join(out), "xlsx_md"
+        elif ext in (".xlsx", ".xlsm") and openpyxl:
             wb = openpyxl.load_workbook(safe_p, data_only=True, read_only=True)
             for ws in wb.worksheets[:10]:
                 out.append(f"## Sheet: {ws.title}")
                 for row in ws.iter_rows(max_row=400, max_col=40, values_only=True):
                     if any(row):
-                        out.append("| " + " | ".join([str(c).strip().replace("\n", " ") if c is not None else "" for c in row]) + " |")
+                        out.append("| " + join([(c if c.__class__ is str else str(c)).translate(trans).strip() if c is not None else "" for c in row]) + " |")
                 out.append("")
             wb.close()
             return "\n".join(out), "xlsx_md"
@@ -475,7 +809,7 @@ def extract_excel(path: str) -> Tuple[str, str]:
                 for row_idx in range(min(400, ws.nrows)):
                     row = ws.row_values(row_idx)
                     if any(row):
-                        out.append("| " + " | ".join([str(c).strip().replace("\n", " ") if c else "" for c in row]) + " |")
+                        out.append("| " + join([(c if c.__class__ is str else str(c)).translate(trans).strip() if c else "" for c in row]) + " |")
                 out.append("")
             return "\n".join(out), "xls_md"
         else:
@@ -489,9 +823,11 @@ def extract_xdw(path: str) -> Tuple[str, str]:
     コンソールウィンドウは一切表示しない。"""
     global _XDW2TEXT_PATH
     safe_p = get_safe_path(path)
+    tools = _load_xdw_tools()
+    xdwlib = _load_xdwlib()
 
     # 方法1: xdwlib（Python製DocuWorksバインディング）を優先的に試す
-    if XDWLIB_AVAILABLE:
+    if xdwlib is not None:
         try:
             doc = xdwlib.xdwopen(path)
             texts = [doc[pg].text for pg in range(doc.pages)]
@@ -505,25 +841,17 @@ def extract_xdw(path: str) -> Tuple[str, str]:
     # 方法2: xdw2text.exe を試す
     # 一度見つかったパスをキャッシュ済みなら1回だけ試す（ウィンドウ多発を防止）
     # まだ見つかっていない場合は全候補を順に試す
-    candidates_to_try = [_XDW2TEXT_PATH] if _XDW2TEXT_PATH else XDW2TEXT_CANDIDATES
+    candidates_to_try = [_XDW2TEXT_PATH] if _XDW2TEXT_PATH else tools["xdw2text"]
 
     for cmd in candidates_to_try:
         if not cmd:
             continue
         try:
-            result = subprocess.run(
-                [cmd, safe_p],
-                capture_output=True,
-                text=True,
-                encoding="cp932",
-                errors="ignore",
-                timeout=30,
-                **_WIN_NO_CONSOLE,   # ← Windowsのコンソールウィンドウを非表示
-            )
-            if result.returncode == 0:
+            returncode, stdout = _run_text_tool([cmd, safe_p])
+            if returncode == 0:
                 _XDW2TEXT_PATH = cmd  # 使えるexeを記憶して次回以降の探索を省略
-                if result.stdout.strip():
-                    return result.stdout, "xdw_text"
+                if stdout.strip():
+                    return stdout, "xdw_text"
                 return "", "xdw_empty_or_protected"  # ツールは動いたがファイルが空
         except FileNotFoundError:
             if cmd == _XDW2TEXT_PATH:
@@ -535,27 +863,22 @@ def extract_xdw(path: str) -> Tuple[str, str]:
     # 方法3: xdoc2txt.exe を試す（無料ツール: https://ebstudio.info/home/xdoc2txt.html）
     # DocuWorks Viewer Light をインストールすると DocuWorks Content Filter (iFilter) が
     # 自動インストールされるため、-i オプションで XDW からテキスト抽出できる。
-    global _XDOC2TXT_PATH
-    xdoc2txt_candidates = [_XDOC2TXT_PATH] if _XDOC2TXT_PATH else XDOC2TXT_CANDIDATES
+    global _XDOC2TXT_PATH, _XDOC2TXT_OPTS
+    xdoc2txt_candidates = [_XDOC2TXT_PATH] if _XDOC2TXT_PATH else tools["xdoc2txt"]
     for cmd in xdoc2txt_candidates:
         if not cmd:
             continue
         # まず -i (iFilter) オプションで試す → DocuWorks Viewer Light の iFilter を利用
-        for args in [[cmd, "-i", safe_p], [cmd, safe_p]]:
+        # （前回どちらかで成功していればそちらから試す）
+        for opts in _XDOC2TXT_OPTS:
             try:
-                result = subprocess.run(
-                    args,
-                    capture_output=True,
-                    text=True,
-                    encoding="cp932",
-                    errors="ignore",
-                    timeout=30,
-                    **_WIN_NO_CONSOLE,
-                )
-                if result.returncode == 0 and result.stdout.strip():
+                returncode, stdout = _run_text_tool([cmd, *opts, safe_p])
+                if returncode == 0 and stdout.strip():
                     _XDOC2TXT_PATH = cmd
-                    method_name = "xdw_xdoc2txt_ifilter" if "-i" in args else "xdw_xdoc2txt"
-                    return result.stdout, method_name
+                    if opts != _XDOC2TXT_OPTS[0]:
+                        _XDOC2TXT_OPTS = (opts,) + tuple(o for o in _XDOC2TXT_OPTS if o != opts)
+                    method_name = "xdw_xdoc2txt_ifilter" if "-i" in opts else "xdw_xdoc2txt"
+                    return stdout, method_name
             except FileNotFoundError:
                 if cmd == _XDOC2TXT_PATH:
                     _XDOC2TXT_PATH = None
@@ -565,17 +888,31 @@ def extract_xdw(path: str) -> Tuple[str, str]:
 
     # DocuWorks Viewer Lightがインストール済みの場合でも、
     # テキスト抽出には別途 xdoc2txt.exe が必要（iFilter経由でXDWを読める）
-    return "", f"xdw_text_extractor_missing:cand={len(XDW2TEXT_CANDIDATES)}"
+    return "", f"xdw_text_extractor_missing:cand={len(tools['xdw2text'])}"
+
+@lru_cache(maxsize=32)
+def _split_keywords_re(kws: Tuple[str, ...]) -> Optional["re.Pattern[str]"]:
+    if not kws:
+        return None
+    return re.compile("|".join(f"(?:{k})" for k in kws))
+
+def _compile_split_keywords(kws: List[str]) -> Optional["re.Pattern[str]"]:
+    """本文/添付の区切りパターン（正規表現のリスト）を1つの選択パターンにまとめる
+    同じキーワード構成なら組み立て済みのパターンを使い回す。"""
+    return _split_keywords_re(tuple(kws))
+
+def split_main_attach(text: str, kws) -> Tuple[str, str]:
+    """本文と添付資料（別添・別紙・記 以降）に分ける。
 
-def split_main_attach(text: str, kws: List[str]) -> Tuple[str, str]:
+    kws は区切りパターンのリスト、または _compile_split_keywords() でまとめたパターン。
+    各行の先頭で照合する（行ごとにキーワード数だけ re.match しない）。
+    """
+    split_re = kws if isinstance(kws, re.Pattern) else _compile_split_keywords(kws)
     lines = text.splitlines()
     cut_idx = -1
-    for i, line in enumerate(lines):
-        for k in kws:
-            if re.match(k, line):
-                cut_idx = i
-                break
-        if cut_idx != -1: break
+    if split_re is not None:
+        match = split_re.match
+        cut_idx = next((i for i, line in enumerate(lines) if match(line)), -1)
 
     if cut_idx > 5:
         main_text = "\n".join(lines[:cut_idx])
@@ -586,12 +923,14 @@ def split_main_attach(text: str, kws: List[str]) -> Tuple[str, str]:
 # ── 文書タイプ自動判別 ──────────────────────────────────
 
 # フォルダ名による判別キーワード
-_DOCTYPE_FOLDER_LAW = re.compile(
-    r"法令|法律|政令|省令|規則|施行令|施行規則|条例|告示|訓令|条文"
+# いずれも単なる語句なので、正規表現ではなく部分文字列の包含で判定する
+_DOCTYPE_FOLDER_LAW: Tuple[str, ...] = (
+    "法令", "法律", "政令", "省令", "規則", "施行令", "施行規則", "条例", "告示", "訓令", "条文",
 )
-_DOCTYPE_FOLDER_MANUAL = re.compile(
-    r"マニュアル|手順書|手引き|てびき|ガイド|ガイドライン|要領|要綱|内規|規程|SOP|社内|内部"
+_DOCTYPE_FOLDER_MANUAL: Tuple[str, ...] = (
+    "マニュアル", "手順書", "手引き", "てびき", "ガイド", "ガイドライン", "要領", "要綱", "内規", "規程", "SOP", "社内", "内部",
 )
+_DOCTYPE_NOTICE_VERBS: Tuple[str, ...] = ("通知する", "依頼する", "連絡する", "送付する")
 
 # 本文内容による法令判別パターン
 _LAW_ARTICLE_RE = re.compile(r"第[一二三四五六七八九十百千\d１-９０]+条")
@@ -615,35 +954,44 @@ def _detect_doc_type(rel_path: str, text: str) -> str:
     folder_parts = rel_path.replace("\\", "/").rsplit("/", 1)
     folder_path = folder_parts[0] if len(folder_parts) > 1 else ""
 
-    if _DOCTYPE_FOLDER_LAW.search(folder_path):
+    if any(k in folder_path for k in _DOCTYPE_FOLDER_LAW):
         return "法令"
-    if _DOCTYPE_FOLDER_MANUAL.search(folder_path):
+    if any(k in folder_path for k in _DOCTYPE_FOLDER_MANUAL):
         return "マニュアル"
 
     # 本文内容による判別（フォルダ名が使えない場合）
     # 条文パターンが5回以上出現 → 法令本文の可能性が高い
-    target = text[:10000]
-    article_hits = len(_LAW_ARTICLE_RE.findall(target))
+    # （先頭1万文字を切り出さずに範囲指定で走査し、5件見つかった時点で打ち切る）
+    article_hits = sum(1 for _ in islice(_LAW_ARTICLE_RE.finditer(text, 0, 10000), 5))
     if article_hits >= 5:
         # 条文が多数あっても「通知する」等があれば通知
-        if re.search(r"通知する|依頼する|連絡する|送付する", target[:3000]):
+        head = text[:3000]
+        if any(k in head for k in _DOCTYPE_NOTICE_VERBS):
             return "通知"
         return "法令"
 
     return "通知"
 
 
+# ── 和暦→西暦変換（元号ごとの西暦オフセット） ──
+_ERA_RE = re.compile(r"(令和|平成|昭和)\s*([0-9元]+)\s*年")
+_ERA_BASE: Dict[str, int] = {"令和": 2018, "平成": 1988, "昭和": 1925}
+
+
+@lru_cache(maxsize=4096)
+def _era_annotated(whole: str, era: str, year_str: str) -> str:
+    """「令和5年」→「令和5年（2023年）」の置換後文字列（同じ年号は文書をまたいで頻出するのでメモ化）"""
+    year = 1 if year_str == "元" else int(year_str)
+    return f"{whole}（{_ERA_BASE[era] + year}年）"
+
+
+def _era_replacer(match) -> str:
+    return _era_annotated(*match.group(0, 1, 2))
+
+
 def convert_japanese_year(text: str) -> str:
-    def replacer(match):
-        era = match.group(1)
-        year_str = match.group(2)
-        year = 1 if year_str == "元" else int(year_str)
-        if era == "令和": west_year = 2018 + year
-        elif era == "平成": west_year = 1988 + year
-        elif era == "昭和": west_year = 1925 + year
-        else: return match.group(0)
-        return f"{match.group(0)}（{west_year}年）"
-    return re.sub(r"(令和|平成|昭和)\s*([0-9元]+)\s*年", replacer, text)
+    """和暦表記の直後に西暦を付記する（例: 「令和5年」→「令和5年（2023年）」）"""
+    return _ERA_RE.sub(_era_replacer, text)
 
 # 通知タイトルの典型的な末尾パターン（日本の公文書）
 _TITLE_ENDINGS = (
@@ -686,6 +1034,40 @@ _NUMBERED_ITEM_RE = re.compile(
 # 文章の途中（助詞・接続詞・読点）で始まる行はタイトル候補から除外する
 _MID_SENTENCE_RE = re.compile(r"^[てしがのにをはもとなかよりでもし、。・ー…「」]")
 
+# タイトル末尾のパターンもヘッダーと同様に1つの選択パターンにまとめ、1行を1回の走査で判定する
+_TITLE_ENDING_RE = re.compile("|".join(f"(?:{p})" for p in _TITLE_ENDINGS))
+# 上のどのパターンも末尾の空白の直前はこのいずれかの文字になる。
+# strip 済みの行は最後の1文字で先に絞り込み、該当する行だけ _TITLE_ENDING_RE で確かめる
+_TITLE_ENDING_LAST_CHARS = frozenset("て件知）)")
+# ヘッダー・宛先・発出者行のパターンは1つの選択パターンにまとめ、1行を1回の走査で判定する
+# ※ re2 等の別エンジンは使わない（\d や \s がASCII限定になり、全角数字・全角空白の判定が変わるため）
+_HEADER_RE = re.compile("|".join(f"(?:{p})" for p in _HEADER_PATTERNS))
+# 数字・記号・空白だけの行（ページ番号・区切り等）
+_NUM_SYM_ONLY_RE = re.compile(r"^[\d\-\s\(\)（）・ 　]+$")
+
+# タイトル候補から外す行（ヘッダー・文中断片・箇条書き番号）を1回の search で判定する
+# ※ 各パターンは行頭アンカー付きか全体探索なので、選択パターンにしても個別判定の OR と同じ結果になる
+_TITLE_REJECT_PARTS = (_MID_SENTENCE_RE.pattern, _NUMBERED_ITEM_RE.pattern, _HEADER_RE.pattern)
+# 前行結合の可否判定用（上に加えて、タイトル末尾で終わる行も結合しない）
+_TITLE_CONNECT_REJECT_RE = re.compile(
+    "|".join(f"(?:{p})" for p in _TITLE_REJECT_PARTS + (_TITLE_ENDING_RE.pattern,)))
+# 先頭の意味のある行を探す用（上に加えて、数字・記号だけの行も除外）
+_TITLE_SKIP_RE = re.compile(
+    "|".join(f"(?:{p})" for p in (_NUM_SYM_ONLY_RE.pattern,) + _TITLE_REJECT_PARTS))
+
+
+# 日本語文字（ひらがな・カタカナ・漢字）の連続。1文字ずつではなく塊でマッチさせる
+_JP_RUN_RE = re.compile(r'[ぁ-んァ-ン一-龥]+')
+
+
+def _count_jp_chars(s: str) -> int:
+    """日本語文字の数。塊を除いた長さとの差で数える（一致のリストを作らない）
+    ※ 1文字ずつ ord() で範囲判定するより、正規表現で塊ごと処理する方が速い"""
+    return len(s) - len(_JP_RUN_RE.sub("", s))
+# 「について」「に関する」「消防」「危険物」等の通知キーワードで判定
+_OCR_MEANINGFUL_RE = re.compile(
+    r"について|に関する|通知|消防|危険物|規則|政令|省令|条例|届出|許可|検査|安全"
+)
 
 def _compute_ocr_quality(text: str) -> float:
     """OCRテキストの品質スコアを0.0〜1.0で返す。
@@ -693,27 +1075,25 @@ def _compute_ocr_quality(text: str) -> float:
     テキストPDF・Word・Excel等はデフォルト1.0を使い、この関数はOCR結果のみに適用する。"""
     if not text or not text.strip():
         return 0.0
-    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    lines = [l for l in map(str.strip, text.splitlines()) if l]
     if not lines:
         return 0.0
-    total_chars = sum(len(l) for l in lines)
+    total_chars = sum(map(len, lines))
     if total_chars == 0:
         return 0.0
 
     # (1) 日本語文字比率（高い方が良い）
-    jp_chars = len(re.findall(r'[ぁ-んァ-ン一-龥]', text))
+    jp_chars = _count_jp_chars(text)
     jp_ratio = jp_chars / total_chars
 
     # (2) ゴミ行比率（低い方が良い）
-    garbage_count = sum(1 for l in lines if _is_garbage_line(l))
+    # ※ 文書全体の行はほとんどが一度きりなので、メモ化を通さずに判定する
+    #   （キャッシュの出し入れの分だけ速く、タイトル推定等で再利用される行をキャッシュから追い出さない）
+    garbage_count = sum(map(_is_garbage_line.__wrapped__, lines))
     garbage_ratio = garbage_count / len(lines)
 
     # (3) 意味のある単語を含む行の比率（高い方が良い）
-    # 「について」「に関する」「消防」「危険物」等の通知キーワードで判定
-    _meaningful_re = re.compile(
-        r"について|に関する|通知|消防|危険物|規則|政令|省令|条例|届出|許可|検査|安全"
-    )
-    meaningful_lines = sum(1 for l in lines if _meaningful_re.search(l))
+    meaningful_lines = sum(map(bool, map(_OCR_MEANINGFUL_RE.search, lines)))
     meaningful_ratio = meaningful_lines / len(lines)
 
     # (4) 平均行長（極端に短い行が多い = OCR断片化）
@@ -728,6 +1108,13 @@ def _compute_ocr_quality(text: str) -> float:
     return round(min(1.0, max(0.0, score)), 2)
 
 
+# ── OCR化けタイトルの判定パターン ──
+_GARBLED_LEAD_RE = re.compile(r'^[A-Za-z\*\#\$\@\!\?\~\^\&\%\+\=\|\\\/<>]{1,2}[ぁ-んァ-ン一-龥]')
+_GARBLED_JP_PAIR_RE = re.compile(r'^[ぁ-んァ-ン一-龥]{1}[ぁ-んァ-ン一-龥]')
+_GARBLED_FRAGMENT_RE = re.compile(r'[A-Z][ぁ-んァ-ン一-龥]')
+# _GARBLED_LEAD_RE の先頭文字になりうる文字（これ以外で始まる行は正規表現を通さない）
+_GARBLED_LEAD_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz*#$@!?~^&%+=|\\/<>")
+
 def _is_ocr_garbled_title(s: str) -> bool:
     """OCR由来の壊れたタイトル候補を拒否する。
     例: "河顧客に自ら...", "*品としての特月 8日付け..."
@@ -735,25 +1122,27 @@ def _is_ocr_garbled_title(s: str) -> bool:
     if not s:
         return True
     # 先頭1〜2文字がランダムな非日本語文字（OCRゴミの典型）
-    if re.match(r'^[A-Za-z\*\#\$\@\!\?\~\^\&\%\+\=\|\\\/<>]{1,2}[ぁ-んァ-ン一-龥]', s):
+    if s[0] in _GARBLED_LEAD_CHARS and _GARBLED_LEAD_RE.match(s):
         return True
     # 先頭が孤立した1文字の漢字/カナ + 残りの文脈と不整合
     # 例: "河顧客に..." → "河" は前の行からの誤結合
     if (len(s) >= 10
-            and re.match(r'^[ぁ-んァ-ン一-龥]{1}[ぁ-んァ-ン一-龥]', s)
-            and s[0] not in 'のはがをにでもとやへ各本全新旧上下前後'):
+            and s[0] not in 'のはがをにでもとやへ各本全新旧上下前後'
+            and _GARBLED_JP_PAIR_RE.match(s)):
         # 2文字目以降で明確なタイトルパターンが始まるか確認
         rest = s[1:]
-        for pat in _TITLE_ENDINGS:
-            if re.search(pat, rest):
-                # 先頭1文字を除いてタイトルとして成立 → 先頭はOCRゴミ
-                return True
+        if _TITLE_ENDING_RE.search(rest):
+            # 先頭1文字を除いてタイトルとして成立 → 先頭はOCRゴミ
+            return True
     # 120文字超はタイトルとしては異常に長い（OCRの行結合エラーの可能性大）
     if len(s) > 120:
         return True
     # 途中にOCR化けの典型パターン（ランダムな半角英字が日本語文中に混入）
     # 例: "Sいて、可搬式の" → "S" は "さ" のOCR化け
-    fragments = re.findall(r'[A-Z][ぁ-んァ-ン一-龥]', s)
+    # ASCIIだけの行には日本語がないので対象外
+    if s.isascii():
+        return False
+    fragments = _GARBLED_FRAGMENT_RE.findall(s)
     if len(fragments) >= 2:
         return True
     return False
@@ -773,9 +1162,15 @@ _LAW_REF_RE = re.compile(
 )
 
 
-def _extract_related_laws(text: str) -> List[str]:
-    """テキストから関連法令の参照（「政令第○条」等）を抽出する"""
-    target = text[:6000]
+# 同じ本文を何度も解析しないよう、走査対象の先頭部分をキーに結果をメモ化する。
+# キャッシュにはタプルを置き、呼び出し側には毎回新しいリストを返す。
+# ※ SHA1が同じファイルは重複スキップ・マニフェスト再利用で解析まで来ないので、当たるのは
+#   「中身は違うが先頭が同じ」文書（版違い・表紙だけ同じ通知等）だけ。こうした文書は同じ
+#   フォルダに並ぶことが多いので直近の数十件を覚えれば足りる。大きくするとキーの本文
+#   （最大6000/8000文字）を走査の終わりまで大量に抱え込むだけなので小さくしておく
+_TEXT_RESULT_CACHE_SIZE = 64
+@lru_cache(maxsize=_TEXT_RESULT_CACHE_SIZE)
+def _related_laws_cached(target: str) -> Tuple[str, ...]:
     hits = _LAW_REF_RE.findall(target)
     # 重複除去して返す（出現順を維持）
     seen = set()
@@ -785,12 +1180,16 @@ def _extract_related_laws(text: str) -> List[str]:
         if h and len(h) >= 4 and h not in seen:
             seen.add(h)
             result.append(h)
-    return result[:10]  # 最大10件
+    return tuple(result[:10])  # 最大10件
 
 
-def _extract_amendments(text: str) -> List[str]:
-    """テキストから改廃関係の情報を抽出する"""
-    target = text[:6000]
+def _extract_related_laws(text: str) -> List[str]:
+    """テキストから関連法令の参照（「政令第○条」等）を抽出する"""
+    return list(_related_laws_cached(text[:6000]))
+
+
+@lru_cache(maxsize=_TEXT_RESULT_CACHE_SIZE)
+def _amendments_cached(target: str) -> Tuple[str, ...]:
     hits = _AMENDMENT_RE.findall(target)
     result = []
     for groups in hits:
@@ -798,28 +1197,39 @@ def _extract_amendments(text: str) -> List[str]:
             g = g.strip()
             if g and len(g) >= 4 and g not in result:
                 result.append(g)
-    return result[:5]  # 最大5件
+    return tuple(result[:5])  # 最大5件
+
+
+def _extract_amendments(text: str) -> List[str]:
+    """テキストから改廃関係の情報を抽出する"""
+    return list(_amendments_cached(text[:6000]))
 
 
+_SORT_WESTERN_YMD_RE = re.compile(r'(\d{4})\s*年\s*(\d{1,2})\s*月\s*(\d{1,2})\s*日')
+_SORT_PAREN_YEAR_RE = re.compile(r'（(\d{4})年）')
+_SORT_MONTH_DAY_RE = re.compile(r'(\d{1,2})\s*月\s*(\d{1,2})\s*日')
+
+@lru_cache(maxsize=4096)
 def _date_to_sort_key(date_str: str) -> str:
     """日付文字列をYYYYMMDD形式のソートキーに変換する"""
     if not date_str:
         return "99999999"
     # 西暦表記（「2023年3月1日」）
-    m = re.search(r'(\d{4})\s*年\s*(\d{1,2})\s*月\s*(\d{1,2})\s*日', date_str)
+    m = _SORT_WESTERN_YMD_RE.search(date_str)
     if m:
         return f"{m.group(1)}{int(m.group(2)):02d}{int(m.group(3)):02d}"
     # 和暦のカッコ内西暦（「令和5年（2023年）」等 — convert_japanese_yearで追加）
-    m = re.search(r'（(\d{4})年）', date_str)
+    m = _SORT_PAREN_YEAR_RE.search(date_str)
     if m:
         # 月日も取る
-        md = re.search(r'(\d{1,2})\s*月\s*(\d{1,2})\s*日', date_str)
+        md = _SORT_MONTH_DAY_RE.search(date_str)
         if md:
             return f"{m.group(1)}{int(md.group(1)):02d}{int(md.group(2)):02d}"
         return f"{m.group(1)}0101"
     return "99999999"
 
 
+@lru_cache(maxsize=8192)
 def _is_meaningful_title(s: str) -> bool:
     """
     タイトルとして意味のある文字列かを判定する。
@@ -829,12 +1239,23 @@ def _is_meaningful_title(s: str) -> bool:
     """
     if not s:
         return False
-    jp_count = len(re.findall(r'[ぁ-んァ-ン一-龥]', s))
+    jp_count = _count_jp_chars(s)
     if jp_count == 0:
         return False
     return jp_count / len(s) >= 0.15
 
 
+# タイトルとの重複比較で無視する空白・句読点
+# ※ str.translate による削除も試したが、日本語の行では文字クラスの sub の方が速い
+_TITLE_COMPARE_STRIP_RE = re.compile(r'[\s　、。・（）\(\)\-\—\―]')
+
+
+# 1文書の概要生成ではタイトルは毎行同じなので、除去済みの形をメモ化して使い回す
+@lru_cache(maxsize=256)
+def _title_compare_form(title: str) -> str:
+    return _TITLE_COMPARE_STRIP_RE.sub('', title)
+
+
 def _is_similar_to_title(line: str, title: str) -> bool:
     """概要の行がタイトルと内容的に重複しているかを判定する。
     概要冒頭にタイトルがそのまま繰り返されるのを防止するために使う。"""
@@ -843,11 +1264,12 @@ def _is_similar_to_title(line: str, title: str) -> bool:
     # 完全一致・包含関係
     if line in title or title in line:
         return True
-    # 空白・句読点を除去して比較
-    _strip_re = re.compile(r'[\s　、。・（）\(\)\-\—\―]')
-    clean_line = _strip_re.sub('', line)
-    clean_title = _strip_re.sub('', title)
-    if clean_title and clean_line:
+    # 空白・句読点を除去して比較（タイトル側が空になるなら行側の除去は不要）
+    clean_title = _title_compare_form(title)
+    if not clean_title:
+        return False
+    clean_line = _TITLE_COMPARE_STRIP_RE.sub('', line)
+    if clean_line:
         if clean_line in clean_title or clean_title in clean_line:
             return True
     return False
@@ -856,17 +1278,15 @@ def _is_similar_to_title(line: str, title: str) -> bool:
 def guess_title(text: str, fallback: str) -> str:
     """通知タイトルを推定する。
     「〜について」パターンを優先し、OCRゴミ・箇条書き番号・ヘッダー行を厳密に拒否する。"""
-    lines = text.splitlines()
+    # 走査するのは先頭100行（+ 次行の参照用に1行）だけなので、その範囲を1回だけ strip しておく
+    lines = [line.strip() for line in text.splitlines()[:101]]
 
     def _is_title_connectable(line_text: str) -> bool:
         """前行・前々行がタイトルの一部として結合可能かを判定する"""
         return (5 <= len(line_text) <= 120
-                and not any(re.search(p, line_text) for p in _HEADER_PATTERNS)
-                and not _MID_SENTENCE_RE.match(line_text)
-                and not _NUMBERED_ITEM_RE.match(line_text)
+                and not _TITLE_CONNECT_REJECT_RE.search(line_text)
                 and _is_meaningful_title(line_text)
-                and not _is_ocr_garbled_title(line_text)
-                and not any(re.search(pat, line_text) for pat in _TITLE_ENDINGS))
+                and not _is_ocr_garbled_title(line_text))
 
     def _validate_title(candidate: str) -> Optional[str]:
         """タイトル候補の最終バリデーション（OCRゴミ・異常長を拒否）"""
@@ -882,24 +1302,25 @@ def guess_title(text: str, fallback: str) -> str:
 
     # パターン1: 「〜について」「〜に関する件」で終わる行を優先（通知タイトルの典型形）
     # 複数行（最大3行）にまたがるタイトルにも対応
-    for i, line in enumerate(lines[:100]):
-        s = line.strip()
+    for i, s in enumerate(lines[:100]):
+        has_ending = (3 <= len(s) <= 120 and s[-1] in _TITLE_ENDING_LAST_CHARS
+                      and _TITLE_ENDING_RE.search(s) is not None)
 
         # タイトル末尾パターンに一致する行（10文字以上、120文字以内）
-        if 10 <= len(s) <= 120 and any(re.search(pat, s) for pat in _TITLE_ENDINGS):
-            # OCRゴミチェック
-            if _is_ocr_garbled_title(s):
-                continue
+        if has_ending and len(s) >= 10:
             # 箇条書き番号で始まる行はタイトルではない
             if _NUMBERED_ITEM_RE.match(s):
                 continue
+            # OCRゴミチェック
+            if _is_ocr_garbled_title(s):
+                continue
             # 前行がヘッダーでなく意味のある行なら結合してタイトルを補完
             if i > 0:
-                prev = lines[i - 1].strip()
+                prev = lines[i - 1]
                 if _is_title_connectable(prev):
                     # さらに前々行も結合可能か確認（3行にまたがるタイトル）
                     if i > 1:
-                        prev2 = lines[i - 2].strip()
+                        prev2 = lines[i - 2]
                         if _is_title_connectable(prev2):
                             result = _validate_title(prev2 + prev + s)
                             if result:
@@ -910,12 +1331,12 @@ def guess_title(text: str, fallback: str) -> str:
             return s
 
         # タイトル末尾パターンに一致するが短い行（< 10文字）→ 前行と結合
-        if 3 <= len(s) <= 9 and any(re.search(pat, s) for pat in _TITLE_ENDINGS):
+        if has_ending and len(s) <= 9:
             if i > 0:
-                prev = lines[i - 1].strip()
+                prev = lines[i - 1]
                 if _is_title_connectable(prev):
                     if i > 1:
-                        prev2 = lines[i - 2].strip()
+                        prev2 = lines[i - 2]
                         if _is_title_connectable(prev2):
                             result = _validate_title(prev2 + prev + s)
                             if result:
@@ -926,81 +1347,83 @@ def guess_title(text: str, fallback: str) -> str:
 
         # 短い行が続いて次行でタイトルが完結するケース
         if 3 <= len(s) < 10 and i + 1 < len(lines):
-            next_s = lines[i + 1].strip()
+            next_s = lines[i + 1]
             combined = s + next_s
-            if 10 <= len(combined) <= 120 and any(re.search(pat, combined) for pat in _TITLE_ENDINGS):
+            if (10 <= len(combined) <= 120 and combined[-1] in _TITLE_ENDING_LAST_CHARS
+                    and _TITLE_ENDING_RE.search(combined)):
                 result = _validate_title(combined)
                 if result:
                     return result
 
     # パターン2: ヘッダー行・文中断片をスキップして最初の意味のある行を取る
-    for li, line in enumerate(lines[:80]):
-        s = line.strip()
+    for li, s in enumerate(lines[:80]):
         if len(s) < 8 or len(s) > 120:
             continue
-        if re.match(r"^[\d\-\s\(\)（）・ 　]+$", s):
-            continue
-        if any(re.search(p, s) for p in _HEADER_PATTERNS):
-            continue
-        if _MID_SENTENCE_RE.match(s):
+        if _TITLE_SKIP_RE.search(s):
             continue
         if not _is_meaningful_title(s):
             continue
         if _is_ocr_garbled_title(s):
             continue
-        if _NUMBERED_ITEM_RE.match(s):
-            continue
         # 次行と結合するとタイトルになる場合は結合版を返す
         if li + 1 < len(lines):
-            next_s = lines[li + 1].strip()
+            next_s = lines[li + 1]
             combined = s + next_s
-            result = _validate_title(combined)
-            if result and any(re.search(pat, combined) for pat in _TITLE_ENDINGS):
-                return result
+            if combined[-1] in _TITLE_ENDING_LAST_CHARS and _TITLE_ENDING_RE.search(combined):
+                result = _validate_title(combined)
+                if result:
+                    return result
         return s
     return fallback
 
 
+# 法令タイトル推定用: 既知の法令名（長い名称を先に判定する）
+_KNOWN_LAW_NAMES = (
+    "危険物の規制に関する政令", "危険物の規制に関する規則",
+    "消防法施行令", "消防法施行規則", "消防法",
+    "石油コンビナート等災害防止法", "高圧ガス保安法",
+    "液化石油ガスの保安の確保及び取引の適正化に関する法律",
+    "火薬類取締法", "建築基準法",
+)
+# どれか1つでも含む行だけを上の優先順で調べるための一括検索パターン
+_KNOWN_LAW_NAME_RE = re.compile("|".join(map(re.escape, _KNOWN_LAW_NAMES)))
+_LAW_CHAPTER_HEAD_RE = re.compile(r"^第[一二三四五六七八九十]+章")
+_DIGIT_PAREN_ONLY_RE = re.compile(r"^[\d\s（）\(\)]+$")
+
+
 def guess_title_law(text: str, fallback: str) -> str:
     """法令文書のタイトルを推定する。
     法令名（「消防法」「危険物の規制に関する政令」等）を検出する。"""
-    lines = text.splitlines()
+    # 走査するのは先頭50行までなので、その範囲を1回だけ strip しておく
+    lines = [line.strip() for line in text.splitlines()[:50]]
 
     # パターン1: 既知の法令名を直接検出
-    known_laws = [
-        "危険物の規制に関する政令", "危険物の規制に関する規則",
-        "消防法施行令", "消防法施行規則", "消防法",
-        "石油コンビナート等災害防止法", "高圧ガス保安法",
-        "液化石油ガスの保安の確保及び取引の適正化に関する法律",
-        "火薬類取締法", "建築基準法",
-    ]
-    for i, line in enumerate(lines[:30]):
-        s = line.strip()
-        for law_name in known_laws:
-            if law_name in s and len(s) <= 80:
+    for s in lines[:30]:
+        if len(s) > 80 or not _KNOWN_LAW_NAME_RE.search(s):
+            continue
+        for law_name in _KNOWN_LAW_NAMES:
+            if law_name in s:
                 # 「〜の一部を改正する〜」のようなタイトルも拾う
                 if "改正" in s and len(s) >= 10:
                     return s
                 return law_name
 
     # パターン2: 「第一章 総則」等の章立てがある → その前に法令名がある
-    for i, line in enumerate(lines[:50]):
-        s = line.strip()
-        if re.match(r"^第[一二三四五六七八九十]+章", s):
+    for i, s in enumerate(lines):
+        if _LAW_CHAPTER_HEAD_RE.match(s):
             # この行より前で最後の意味のある行が法令名
             for j in range(i - 1, -1, -1):
-                prev = lines[j].strip()
+                prev = lines[j]
                 if prev and len(prev) >= 4 and len(prev) <= 80:
-                    if not re.match(r"^[\d\s（）\(\)]+$", prev):
+                    if not _DIGIT_PAREN_ONLY_RE.match(prev):
                         return prev
             break
 
     # パターン3: 先頭の意味のある行を取る（法令ファイルなのでヘッダーパターンは適用しない）
-    for line in lines[:20]:
-        s = line.strip()
+    for s in lines[:20]:
         if not s or len(s) < 4 or len(s) > 80:
             continue
-        if re.match(r"^[\d\s\-（）\(\)・ 　]+$", s):
+        if _NUM_SYM_ONLY_RE.match(s):
             continue
         if _is_garbage_line(s):
             continue
@@ -1018,7 +1441,7 @@ def guess_title_manual(text: str, fallback: str) -> str:
         s = line.strip()
         if not s or len(s) < 4 or len(s) > 120:
             continue
-        if re.match(r"^[\d\s\-（）\(\)・ 　]+$", s):
+        if _NUM_SYM_ONLY_RE.match(s):
             continue
         if _is_garbage_line(s):
             continue
@@ -1026,36 +1449,119 @@ def guess_title_manual(text: str, fallback: str) -> str:
     return fallback
 
 
+_DATE_WAREKI_RE = re.compile(r"(令和|平成|昭和)\s*[0-9元]+\s*年\s*\d+\s*月\s*\d+\s*日(（\d{4}年）)?")
+_DATE_WESTERN_RE = re.compile(r"\d{4}\s*年\s*\d{1,2}\s*月\s*\d{1,2}\s*日")
+_ISSUER_CANDIDATES = ("消防庁", "総務省消防庁", "消防局", "危険物保安室", "予防課")
+
+# 和暦・西暦の日付を1回の走査で拾う（和暦を優先し、和暦がなければ最初の西暦）
+# ※ 西暦の一致は数字と年月日だけなので、和暦の開始位置を飲み込むことはない
+_DATE_ANY_RE = re.compile(f"(?P<wareki>{_DATE_WAREKI_RE.pattern})|(?P<western>{_DATE_WESTERN_RE.pattern})")
+
+# 発出日・施行日はほぼ文書冒頭にあるので、長い文書はまず先頭だけを探す。
+# 先頭で見つからない場合と、窓の末尾付近の一致（窓で切れている可能性がある）は全文で探し直す。
+_HEAD_SCAN_CHARS = 8000
+_HEAD_SCAN_MARGIN = 32
+
+def _search_head_first(pattern: "re.Pattern[str]", text: str) -> Optional["re.Match[str]"]:
+    """pattern.search(text) と同じ一致を、まず先頭 _HEAD_SCAN_CHARS 文字だけで探す"""
+    if len(text) > _HEAD_SCAN_CHARS:
+        m = pattern.search(text, 0, _HEAD_SCAN_CHARS)
+        if m and m.end() <= _HEAD_SCAN_CHARS - _HEAD_SCAN_MARGIN:
+            return m
+    return pattern.search(text)
+
 def guess_date(text: str) -> str:
-    m = re.search(r"(令和|平成|昭和)\s*[0-9元]+\s*年\s*\d+\s*月\s*\d+\s*日(（\d{4}年）)?", text)
-    if m: return m.group(0)
-    m2 = re.search(r"\d{4}\s*年\s*\d{1,2}\s*月\s*\d{1,2}\s*日", text)
-    return m2.group(0) if m2 else ""
+    # 和暦が先頭にあればそれで確定（和暦がない場合のみ西暦を使うので、西暦は全文を見てから決める）
+    if len(text) > _HEAD_SCAN_CHARS:
+        m = _DATE_WAREKI_RE.search(text, 0, _HEAD_SCAN_CHARS)
+        if m and m.end() <= _HEAD_SCAN_CHARS - _HEAD_SCAN_MARGIN:
+            return m.group(0)
+    western = ""
+    for m in _DATE_ANY_RE.finditer(text):
+        if m.group("wareki") is not None:
+            return m.group(0)
+        if not western:
+            western = m.group(0)
+    return western
 
 def guess_issuer(text: str) -> str:
-    for cand in ["消防庁", "総務省消防庁", "消防局", "危険物保安室", "予防課"]:
+    for cand in _ISSUER_CANDIDATES:
         if cand in text: return cand
     return ""
 
-def tag_text(text: str) -> Tuple[List[str], List[str], Dict[str, List[str]]]:
-    ev: Dict[str, List[str]] = {}; fac: List[str] = []; work: List[str] = []
-    target = text[:8000]
+# ── タグ判定の一括走査 ──
+# タグのパターンはほとんどが単なる語句なので、語句は1回の走査でまとめて探し、
+# 正規表現の記号を含むもの（"タンク底板?" "\bSS\b" 等）は1つの選択パターンにまとめて走査する。
+_TAG_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+_TAG_PATTERNS: Tuple[str, ...] = tuple(dict.fromkeys(
+    p for tags in (FACILITY_TAGS, WORK_TAGS) for ps in tags.values() for p in ps))
+_TAG_LITERALS: Tuple[str, ...] = tuple(p for p in _TAG_PATTERNS if _TAG_REGEX_META.isdisjoint(p))
+_TAG_REGEXES: Dict[str, "re.Pattern[str]"] = {
+    p: re.compile(p) for p in _TAG_PATTERNS if not _TAG_REGEX_META.isdisjoint(p)}
+_TAG_REGEX_GROUPS: Dict[str, str] = {f"t{i}": p for i, p in enumerate(_TAG_REGEXES)}
+_TAG_REGEX_UNION_RE = re.compile("|".join(f"(?P<{g}>{p})" for g, p in _TAG_REGEX_GROUPS.items()))
+
+@lru_cache(maxsize=None)
+def _tag_automaton():
+    """pyahocorasick があれば語句パターン全体の Aho-Corasick オートマトンを返す。なければ None"""
+    try:
+        import ahocorasick
+        ac = ahocorasick.Automaton()
+        for p in _TAG_LITERALS:
+            ac.add_word(p, p)
+        ac.make_automaton()
+        return ac
+    except Exception:
+        return None
+
+def _find_tag_patterns(target: str) -> set:
+    """target に現れるタグパターン（語句・正規表現とも元の文字列）の集合"""
+    ac = _tag_automaton()
+    if ac is not None:
+        found = {p for _, p in ac.iter(target)}
+    else:
+        found = {p for p in _TAG_LITERALS if p in target}
+    if _TAG_REGEXES:
+        hits = set()
+        for m in _TAG_REGEX_UNION_RE.finditer(target):
+            hits.add(_TAG_REGEX_GROUPS[m.lastgroup])
+            if len(hits) == len(_TAG_REGEXES):
+                break
+        # finditer は重ならない一致しか返さないので、何か一致したときだけ
+        # 残りのパターンを個別に確かめる（一致の陰に隠れた一致を取りこぼさないため）
+        if hits:
+            hits.update(p for p, rx in _TAG_REGEXES.items() if p not in hits and rx.search(target))
+        found |= hits
+    return found
+
+@lru_cache(maxsize=_TEXT_RESULT_CACHE_SIZE)
+def _tag_text_cached(target: str) -> Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[Tuple[str, Tuple[str, ...]], ...]]:
+    ev: List[Tuple[str, Tuple[str, ...]]] = []; fac: List[str] = []; work: List[str] = []
+    found = _find_tag_patterns(target)
     for t, ps in FACILITY_TAGS.items():
-        if hits := [p for p in ps if re.search(p, target)]:
-            fac.append(t); ev[t] = hits[:3]
+        if hits := [p for p in ps if p in found]:
+            fac.append(t); ev.append((t, tuple(hits[:3])))
     for t, ps in WORK_TAGS.items():
-        if hits := [p for p in ps if re.search(p, target)]:
-            work.append(t); ev[t] = hits[:3]
+        if hits := [p for p in ps if p in found]:
+            work.append(t); ev.append((t, tuple(hits[:3])))
     # ※「共通」フォールバックは廃止。施設が特定できない通知はタグなしとする。
-    return fac, work, ev
+    return tuple(fac), tuple(work), tuple(ev)
+
+def tag_text(text: str) -> Tuple[List[str], List[str], Dict[str, List[str]]]:
+    fac, work, ev = _tag_text_cached(text[:8000])
+    return list(fac), list(work), {t: list(hits) for t, hits in ev}
 
 def _normalize_line(s: str) -> str:
     """PDF抽出由来の行内スペースを正規化する"""
     # 日本語文字間の不要スペースを除去（例: "令 和 3 年" → "令和3年"）
     # ※ 数字↔日本語間のスペースは箇条書き番号等で意味があるので除去しない
-    s = re.sub(r'([ぁ-んァ-ン一-龥])[ \t]+([ぁ-んァ-ン一-龥])', r'\1\2', s)
+    # ※ どちらの置換も半角スペース・タブが対象なので、含まない行（大半の行）はそのまま返す
+    if " " not in s and "\t" not in s:
+        return s
+    if not s.isascii():
+        s = _JP_SPACE_RE.sub(r'\1\2', s)
     # 連続する半角スペースを1つに（全角スペース・先頭インデントは保持）
-    s = re.sub(r'[ \t]{2,}', ' ', s)
+    s = _MULTI_SPACE_RE.sub(' ', s)
     return s
 
 
@@ -1081,11 +1587,18 @@ _GARBAGE_LINE_RE = re.compile(
     r"[・\-]{3,}"                         # 点線・ハイフン3個以上
     r")[\s　]*$"
 )
+_SHORT_NO_JP_RE = re.compile(r"^[^\u3041-\u9FFF]*$")
+_ASCII_UPPER_RUN_RE = re.compile(r'[A-Z]{4,}')
 
-# ── 終端行パターン ──
-_TERMINATOR_RE = re.compile(
-    r"^\s*(以上|以下余白|（了）|－\s*了\s*－|【以上】|〔以上〕)\s*$"
-)
+# ── 終端行（以上・了 等）──
+# 固定の語句だけなので、前後の空白を除いた行との比較で判定する（「－ 了 －」だけは内側の空白が任意）
+_TERMINATOR_WORDS = frozenset(("以上", "以下余白", "（了）", "【以上】", "〔以上〕"))
+
+def _is_terminator_line(s: str) -> bool:
+    t = s.strip()
+    if t in _TERMINATOR_WORDS:
+        return True
+    return len(t) >= 3 and t[0] == "－" and t[-1] == "－" and t[1:-1].strip() == "了"
 
 # ── フッター行パターン（担当者・問い合わせ先・電話番号・ページ番号等） ──
 _FOOTER_LINE_RE = re.compile(
@@ -1098,13 +1611,26 @@ _FOOTER_LINE_RE = re.compile(
     r"^\s*[－\-]\s*\d+\s*[－\-]\s*$"
 )
 
-# ── 趣旨文の末尾パターン（日本の公文書定型：「通知する。」等で終わる行） ──
-_INTENT_SENTENCE_END_RE = re.compile(
-    r"(通知する|通知します|伝達する|送付する|連絡する|回答する|依頼する"
-    r"|お知らせする|お伝えする|送付します|依頼します)。?\s*$"
-)
+# ── 趣旨文の末尾（日本の公文書定型：「通知する。」等で終わる行） ──
+_INTENT_VERBS = ("通知する", "通知します", "伝達する", "送付する", "連絡する", "回答する", "依頼する",
+                 "お知らせする", "お伝えする", "送付します", "依頼します")
+
+def _ends_with_intent_verb(s: str) -> bool:
+    """末尾の空白と句点1つを除いて、趣旨文の定型動詞で終わっているか"""
+    t = s.rstrip()
+    if t.endswith("。"):
+        t = t[:-1]
+    return t.endswith(_INTENT_VERBS)
+
+# 句点・閉じ括弧で終わる行（短い行でも次行と連結しない）。末尾の空白を除いて endswith で判定する
+_CONTINUATION_END_CHARS = ("。", "、", "」", "）", ")")
+# 「記」だけの行（記書きの開始）
+_KI_LINE_RE = re.compile(r"\n\s*記\s*\n")
+# 件名に典型的な「〜について」「〜に関する」等
+_ABOUT_PHRASE_RE = re.compile(r"について|に関する|に関して|に係る")
 
 # ── 施行日・適用日のパターン ──
+_ENFORCEMENT_YMD_RE = re.compile(r"(?:令和|平成|昭和)\s*[0-9元]+\s*年\s*\d+\s*月\s*\d+\s*日")
 _ENFORCEMENT_DATE_RE = re.compile(
     r"(?:施行|適用|公布|発効|実施|以降|より)"
     r".{0,6}"
@@ -1115,19 +1641,22 @@ _ENFORCEMENT_DATE_RE = re.compile(
 )
 
 
+# 行判定は同じ行がタイトル推定・行連結・概要整形で何度も呼ばれるのでメモ化する（_is_meaningful_title 等も同様）
+@lru_cache(maxsize=8192)
 def _is_garbage_line(s: str) -> bool:
     """OCRゴミ・孤立記号・罫線・日本語皆無行などの除去すべき行か判定する"""
     if not s:
         return False
     # 1〜2文字のみ（記号・数字・カナ等）は除去
-    if len(s) <= 2 and re.match(r"^[^\u3041-\u9FFF]*$", s):
+    if len(s) <= 2 and _SHORT_NO_JP_RE.match(s):
         return True
     if _GARBAGE_LINE_RE.match(s):
         return True
     # OCRゴミ検出: スペースを除いた文字で判定
     no_space = s.replace(' ', '').replace('　', '').replace('\t', '')
     if len(no_space) >= 4:
-        jp_count = len(re.findall(r'[ぁ-んァ-ン一-龥]', no_space))
+        # ASCIIだけの行は日本語0文字と分かるので正規表現を通さない
+        jp_count = 0 if no_space.isascii() else _count_jp_chars(no_space)
         total = len(no_space)
         # (1) 日本語文字が一切ない → OCRゴミ
         if jp_count == 0 and total >= 6:
@@ -1138,61 +1667,65 @@ def _is_garbage_line(s: str) -> bool:
             return True
         # (3) 連続するASCII大文字が多い → OCR化けの典型
         #     例: "NMWMMMMMUMNMNI" の中にカタカナ1文字混入
-        ascii_upper_runs = re.findall(r'[A-Z]{4,}', no_space)
-        if ascii_upper_runs and sum(len(r) for r in ascii_upper_runs) > total * 0.5:
-            return True
+        #     英大文字は日本語以外の文字にしか含まれないので、日本語が半数以上の行は走査するまでもない
+        if total - jp_count > total * 0.5:
+            ascii_upper_runs = _ASCII_UPPER_RUN_RE.findall(no_space)
+            if ascii_upper_runs and sum(map(len, ascii_upper_runs)) > total * 0.5:
+                return True
     return False
 
 
+@lru_cache(maxsize=8192)
 def _is_header_or_footer(s: str) -> bool:
     """ヘッダー（発出者・宛先・文書番号）またはフッター行か判定する"""
     return bool(
-        any(re.search(p, s) for p in _HEADER_PATTERNS)
+        _HEADER_RE.search(s)
         or _FOOTER_LINE_RE.search(s)
     )
 
 
-def _join_short_continuation_lines(lines: List[str]) -> List[str]:
+def _iter_joined_lines(lines: Iterable[str]) -> Iterator[str]:
     """
-    PDF抽出で途切れた短い行を次行と連結する。
+    PDF抽出で途切れた短い行を次行と連結しながら1行ずつ返す（先読みは1行だけ）。
     ─ 校閲官合意ルール ─
     ・ゴミ行・終端行は連結しない（そのまま渡して後段でフィルタ）
     ・行末が句読点「。」「、」で終わっている → 完結行なので連結しない
     ・行頭が箇条書き番号 → 新項目の開始なので連結しない
     ・行の長さが10文字未満かつ上記に該当しない → 次行の先頭に連結
     """
-    result: List[str] = []
-    i = 0
-    while i < len(lines):
-        s = lines[i]
+    it = iter(lines)
+    s = next(it, None)
+    while s is not None:
+        nxt = next(it, None)
         # ゴミ行・終端行はそのまま（次行と混ぜない）
-        if _is_garbage_line(s) or _TERMINATOR_RE.match(s):
-            result.append(s)
-            i += 1
+        if _is_garbage_line(s) or _is_terminator_line(s):
+            yield s
+            s = nxt
             continue
         # 短い行で、次行があり、箇条書き番号で始まらず、句点で終わらない → 連結
         if (len(s) < 10
-                and i + 1 < len(lines)
+                and nxt is not None
                 and not _BULLET_RE.match(s)
-                and not _is_garbage_line(lines[i + 1])
-                and not re.search(r"[。、」）\)]\s*$", s)):
-            result.append(s + lines[i + 1])
-            i += 2
+                and not _is_garbage_line(nxt)
+                and not s.rstrip().endswith(_CONTINUATION_END_CHARS)):
+            yield s + nxt
+            s = next(it, None)
             continue
-        result.append(s)
-        i += 1
-    return result
+        yield s
+        s = nxt
+
+
+def _join_short_continuation_lines(lines: List[str]) -> List[str]:
+    """PDF抽出で途切れた短い行を次行と連結する（規則は _iter_joined_lines を参照）"""
+    return list(_iter_joined_lines(lines))
 
 
 def _extract_enforcement_date(text: str) -> str:
     """テキストから施行日・適用日を抽出して整形文字列を返す"""
-    m = _ENFORCEMENT_DATE_RE.search(text)
+    m = _search_head_first(_ENFORCEMENT_DATE_RE, text)
     if m:
         # 年月日部分だけ取り出す
-        date_m = re.search(
-            r"(?:令和|平成|昭和)\s*[0-9元]+\s*年\s*\d+\s*月\s*\d+\s*日",
-            m.group(0)
-        )
+        date_m = _ENFORCEMENT_YMD_RE.search(m.group(0))
         if date_m:
             return date_m.group(0)
     return ""
@@ -1210,10 +1743,9 @@ def _format_summary(core: str, n: int, title_hint: str = "") -> str:
     5. 終端行（以上・了等）でストップ
     6. 文字数上限でカット
     """
-    # 前処理: 行ごとにスペース正規化
-    raw_lines = [_normalize_line(l.strip()) for l in core.splitlines()]
-    # 短い途切れ行を連結
-    merged = _join_short_continuation_lines(raw_lines)
+    # 前処理: 行ごとにスペース正規化 → 短い途切れ行を連結
+    # （中間リストを作らず1行ずつ流すので、文字数上限に達した後ろの行は正規化もしない）
+    merged = _iter_joined_lines(map(_normalize_line, map(str.strip, core.splitlines())))
 
     result_lines: List[str] = []
     char_count = 0
@@ -1225,7 +1757,7 @@ def _format_summary(core: str, n: int, title_hint: str = "") -> str:
         stripped = line.strip()
 
         # 終端行でストップ
-        if _TERMINATOR_RE.match(stripped):
+        if _is_terminator_line(stripped):
             break
 
         # 空行処理（連続空行を1つに）
@@ -1245,7 +1777,8 @@ def _format_summary(core: str, n: int, title_hint: str = "") -> str:
         # 冒頭フェーズ: タイトル行が概要に重複表示されるのを防止
         if initial_phase:
             # タイトル末尾パターン（「〜について」等）に一致する行はスキップ
-            if any(re.search(pat, stripped) for pat in _TITLE_ENDINGS) and len(stripped) <= 200:
+            if (len(stripped) <= 200 and stripped[-1] in _TITLE_ENDING_LAST_CHARS
+                    and _TITLE_ENDING_RE.search(stripped)):
                 continue
             # title_hintと内容が重複する行をスキップ
             if title_hint and _is_similar_to_title(stripped, title_hint):
@@ -1291,7 +1824,7 @@ def make_summary(main_text: str, n: int, title_hint: str = "",
     enforcement_date = _extract_enforcement_date(main_text)
 
     # ── Step 2: 「記」の有無で分岐 ──
-    ki_match = re.search(r"\n\s*記\s*\n", main_text)
+    ki_match = _KI_LINE_RE.search(main_text)
 
     if ki_match:
         # 【記あり】趣旨（記より前）+ 記以降の要点
@@ -1306,16 +1839,16 @@ def make_summary(main_text: str, n: int, title_hint: str = "",
             if not s or _is_garbage_line(s) or _is_header_or_footer(s):
                 continue
             intent_buf += s
-            if any(re.search(pat, intent_buf) for pat in _TITLE_ENDINGS):
+            if intent_buf[-1] in _TITLE_ENDING_LAST_CHARS and _TITLE_ENDING_RE.search(intent_buf):
                 intent_buf = ""
                 continue
             if title_hint and _is_similar_to_title(intent_buf, title_hint):
                 intent_buf = ""
                 continue
-            if _INTENT_SENTENCE_END_RE.search(intent_buf):
+            if _ends_with_intent_verb(intent_buf):
                 intent_result = intent_buf
                 break
-            if re.search(r"。\s*$", intent_buf):
+            if intent_buf.rstrip().endswith("。"):
                 intent_result = intent_buf
                 break
             if len(intent_buf) >= 200:
@@ -1342,7 +1875,7 @@ def make_summary(main_text: str, n: int, title_hint: str = "",
         # タイトル行（「〜について」等）を探してその次行から開始
         for i, line in enumerate(lines[:80]):
             s = line.strip()
-            if re.search(r"について|に関する|に関して|に係る", s) and 10 <= len(s) <= 200:
+            if _ABOUT_PHRASE_RE.search(s) and 10 <= len(s) <= 200:
                 start = i + 1
                 break
             if title_hint and _is_similar_to_title(s, title_hint) and len(s) >= 8:
@@ -1355,7 +1888,7 @@ def make_summary(main_text: str, n: int, title_hint: str = "",
                 s = line.strip()
                 if not s or len(s) < 8 or len(s) > 150:
                     continue
-                if any(re.search(p, s) for p in _HEADER_PATTERNS):
+                if _HEADER_RE.search(s):
                     continue
                 if _MID_SENTENCE_RE.match(s):
                     continue
@@ -1380,7 +1913,7 @@ def make_summary(main_text: str, n: int, title_hint: str = "",
         intent_part = ""
         rest_part = body_formatted
         for bline in body_formatted.splitlines():
-            if re.search(r"。\s*$", bline) or _INTENT_SENTENCE_END_RE.search(bline):
+            if bline.rstrip().endswith("。") or _ends_with_intent_verb(bline):
                 intent_part = bline
                 rest_idx = body_formatted.index(bline) + len(bline)
                 rest_part = body_formatted[rest_idx:].strip()
@@ -1405,25 +1938,35 @@ def make_summary(main_text: str, n: int, title_hint: str = "",
     return combined[:n] + ("…" if len(combined) > n else "")
 
 
+# ── 法令・マニュアルの概要で使う構造パターン ──
+_LAW_FIRST_ARTICLE_PREFIXES = ("第一条", "第1条", "第１条")
+_LAW_LATER_ARTICLE_RE = re.compile(r"^第[二三四五2-9２-９]")
+_LAW_CHAPTER_LINE_RE = re.compile(r"^(第[一二三四五六七八九十百]+章)\s*(.*)")
+_LAW_ARTICLE_CAPTION_RE = re.compile(
+    r"^(第[一二三四五六七八九十百千\d１-９０]+条(?:の[一二三四五六七八九十\d１-９０]+)?)\s*[（(]([^）)]+)[）)]")
+_MANUAL_PURPOSE_RE = re.compile(r"目的|趣旨|はじめに|概要|対象")
+_MANUAL_SECTION_HEAD_RE = re.compile(r"^(?:\d+[\.．\s]|第\d+[章節項]|[（(]\d+[）)])")
+
+
 def make_summary_law(text: str, n: int, title_hint: str = "") -> str:
     """法令文書の概要を生成する。
     条文構造（第○条）を認識し、目的条項・主要条文を抽出する。"""
     if not text.strip():
         return ""
 
-    lines = text.splitlines()
+    # 目的条・章立て・条見出しの3回の走査で使うので、全行を1回だけ strip しておく
+    lines = [line.strip() for line in text.splitlines()]
     parts: List[str] = []
 
     # ── 目的条項を探す（第1条 or 第一条） ──
     purpose_text = ""
-    for i, line in enumerate(lines):
-        s = line.strip()
-        if re.match(r"^第[一1１]条", s):
+    for i, s in enumerate(lines):
+        if s.startswith(_LAW_FIRST_ARTICLE_PREFIXES):
             # 目的条の内容を収集（次の条文まで）
             buf = [s]
             for j in range(i + 1, min(i + 20, len(lines))):
-                next_s = lines[j].strip()
-                if re.match(r"^第[二三四五2-9２-９]", next_s):
+                next_s = lines[j]
+                if _LAW_LATER_ARTICLE_RE.match(next_s):
                     break
                 if next_s:
                     buf.append(next_s)
@@ -1437,9 +1980,8 @@ def make_summary_law(text: str, n: int, title_hint: str = "") -> str:
 
     # ── 章立て構造を抽出 ──
     chapters = []
-    for line in lines:
-        s = line.strip()
-        m = re.match(r"^(第[一二三四五六七八九十百]+章)\s*(.*)", s)
+    for s in lines:
+        m = _LAW_CHAPTER_LINE_RE.match(s)
         if m:
             chapters.append(f"{m.group(1)} {m.group(2)}")
     if chapters:
@@ -1447,9 +1989,8 @@ def make_summary_law(text: str, n: int, title_hint: str = "") -> str:
 
     # ── 主要条文の見出しを抽出 ──
     article_heads = []
-    for line in lines:
-        s = line.strip()
-        m = re.match(r"^(第[一二三四五六七八九十百千\d１-９０]+条(?:の[一二三四五六七八九十\d１-９０]+)?)\s*[（(]([^）)]+)[）)]", s)
+    for s in lines:
+        m = _LAW_ARTICLE_CAPTION_RE.match(s)
         if m:
             article_heads.append(f"{m.group(1)}（{m.group(2)}）")
     if article_heads and not chapters:
@@ -1475,17 +2016,18 @@ def make_summary_manual(text: str, n: int, title_hint: str = "") -> str:
         return ""
 
     lines = text.splitlines()
+    # 目的・見出しの走査は先頭200行だけなので、その範囲を1回だけ strip しておく
+    head = [line.strip() for line in lines[:200]]
     parts: List[str] = []
 
     # ── 目的・趣旨を探す ──
     purpose_text = ""
-    for i, line in enumerate(lines[:100]):
-        s = line.strip()
-        if re.search(r"目的|趣旨|はじめに|概要|対象", s) and len(s) >= 4:
+    for i, s in enumerate(head[:100]):
+        if _MANUAL_PURPOSE_RE.search(s) and len(s) >= 4:
             # この行以降の内容を収集
             buf = []
-            for j in range(i + 1, min(i + 10, len(lines))):
-                next_s = lines[j].strip()
+            for j in range(i + 1, min(i + 10, len(head))):
+                next_s = head[j]
                 if not next_s:
                     if buf:
                         break
@@ -1502,10 +2044,9 @@ def make_summary_manual(text: str, n: int, title_hint: str = "") -> str:
 
     # ── 見出し構造を抽出 ──
     headings = []
-    for line in lines[:200]:
-        s = line.strip()
+    for s in head:
         # 番号付き見出し（「1. 」「第1章」「(1)」等）
-        if re.match(r"^(?:\d+[\.．\s]|第\d+[章節項]|[（(]\d+[）)])", s) and 5 <= len(s) <= 80:
+        if _MANUAL_SECTION_HEAD_RE.match(s) and 5 <= len(s) <= 80:
             headings.append(s)
     if headings:
         parts.append("[構成]\n" + "\n".join(headings[:15]))
@@ -1538,38 +2079,70 @@ def _xls_safe(s) -> str:
     return _ILLEGAL_CHARS_RE.sub("", s)
 
 def write_excel_index(outdir: str, records: List[Record]):
+    openpyxl = _load_openpyxl()
     if not openpyxl: return
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font, Alignment, PatternFill, NamedStyle, DEFAULT_FONT
+    from openpyxl.utils import get_column_letter
 
     # ── 色定義 ──────────────────────────────────────────────────
     HEADER_BG   = PatternFill(fill_type="solid", fgColor="1E3A8A")   # 濃青
     OK_BG       = PatternFill(fill_type="solid", fgColor="DCFCE7")   # 薄緑
     REV_BG      = PatternFill(fill_type="solid", fgColor="FEE2E2")   # 薄赤
     HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
+    REV_FONT    = Font(bold=True, color="DC2626")
     WRAP_CENTER = Alignment(horizontal="center", vertical="top", wrap_text=True)
     WRAP_LEFT   = Alignment(horizontal="left",   vertical="top", wrap_text=True)
 
-    wb = openpyxl.Workbook()
+    # 書き込み専用モード: 行ごとに書式付きセルを作ってそのままファイルへ流す（全セルをメモリに保持しない）
+    # ※ 列幅・行の高さ・ウィンドウ枠の固定は最初の行を書く前に設定しておく必要がある
+    wb = openpyxl.Workbook(write_only=True)
+
+    # セルの書式は名前付きスタイルとして1回だけ登録し、セルには名前で割り当てる
+    # （セルごとに塗り・フォント・配置を個別に設定するとそのたびに書式表の検索が走る）
+    def _add_style(name, fill, font=DEFAULT_FONT, alignment=None):
+        style = NamedStyle(name=name)
+        style.fill = fill
+        style.font = font  # 指定がなければブックの既定フォント（NamedStyle の初期値はサイズ・色が空）
+        if alignment is not None:
+            style.alignment = alignment
+        wb.add_named_style(style)
+
+    _add_style("nf_header", HEADER_BG, HEADER_FONT, WRAP_CENTER)
+    _add_style("nf_header_label", HEADER_BG, Font(bold=True, color="FFFFFF"), WRAP_CENTER)
+    _add_style("nf_ok", OK_BG, alignment=WRAP_LEFT)
+    _add_style("nf_ok_center", OK_BG, alignment=WRAP_CENTER)
+    _add_style("nf_rev", REV_BG, alignment=WRAP_LEFT)
+    _add_style("nf_rev_center", REV_BG, alignment=WRAP_CENTER)
+    _add_style("nf_rev_status", REV_BG, REV_FONT, WRAP_CENTER)
+
+    def _cell(ws_, value, style):
+        cell = WriteOnlyCell(ws_, value=value)
+        cell.style = style
+        return cell
 
     # ── シート①: 文書一覧 ──────────────────────────────────────
-    ws = wb.active
-    ws.title = "文書一覧"
+    ws = wb.create_sheet("文書一覧")
 
     headers = ["No.", "タイプ", "タイトル(推定)", "日付(推定)", "発出者", "施設タグ", "業務タグ", "状態", "理由", "概要", "元ファイル"]
-    ws.append(headers)
-
-    # ヘッダー行の書式
-    for col_idx in range(1, len(headers) + 1):
-        cell = ws.cell(row=1, column=col_idx)
-        cell.fill   = HEADER_BG
-        cell.font   = HEADER_FONT
-        cell.alignment = WRAP_CENTER
+
+    # 列幅（近似値）
+    col_widths = [6, 10, 42, 20, 14, 24, 24, 8, 32, 55, 50]
+    for i, w in enumerate(col_widths, 1):
+        ws.column_dimensions[get_column_letter(i)].width = w
     ws.row_dimensions[1].height = 30
+    # フリーズとオートフィルター
+    ws.freeze_panes = "A2"
+    ws.auto_filter.ref = f"A1:{get_column_letter(len(headers))}{len(records) + 1}"
+
+    # ヘッダー行
+    ws.append([_cell(ws, h, "nf_header") for h in headers])
 
     # データ行
     for seq, r in enumerate(records, start=1):
         status = "要確認" if r.needs_review else "正常"
         summary_short = _xls_safe(r.summary[:400] if r.summary else "")
-        ws.append([
+        values = [
             seq,
             r.doc_type,
             _xls_safe(r.title_guess),
@@ -1581,83 +2154,51 @@ def write_excel_index(outdir: str, records: List[Record]):
             _xls_safe(r.reason),
             summary_short,
             _xls_safe(r.relpath),
-        ])
-        row_num = seq + 1
-        fill = REV_BG if r.needs_review else OK_BG
-        for col_idx in range(1, len(headers) + 1):
-            cell = ws.cell(row=row_num, column=col_idx)
-            cell.fill = fill
-            cell.alignment = WRAP_LEFT
-        # タイプ列・状態列はセンタリング
-        ws.cell(row=row_num, column=2).alignment = WRAP_CENTER
-        ws.cell(row=row_num, column=8).alignment = WRAP_CENTER
-        # 「要確認」セルは赤字で強調
+        ]
         if r.needs_review:
-            ws.cell(row=row_num, column=8).font = Font(bold=True, color="DC2626")
-
-    # 列幅（近似値）
-    col_widths = [6, 10, 42, 20, 14, 24, 24, 8, 32, 55, 50]
-    for i, w in enumerate(col_widths, 1):
-        ws.column_dimensions[get_column_letter(i)].width = w
-
-    # フリーズとオートフィルター
-    ws.freeze_panes = "A2"
-    ws.auto_filter.ref = ws.dimensions
+            base, center, status_style = "nf_rev", "nf_rev_center", "nf_rev_status"  # 「要確認」セルは赤字で強調
+        else:
+            base, center, status_style = "nf_ok", "nf_ok_center", "nf_ok_center"
+        row = [_cell(ws, v, base) for v in values]
+        # タイプ列・状態列はセンタリング
+        row[1].style = center
+        row[7].style = status_style
+        ws.append(row)
 
     # ── シート②: サマリー ──────────────────────────────────────
     ws2 = wb.create_sheet("サマリー")
+    ws2.column_dimensions["A"].width = 50
+    ws2.column_dimensions["B"].width = 10
     ok_count  = sum(1 for r in records if not r.needs_review)
     rev_count = len(records) - ok_count
 
-    def _s2_header(row, label):
-        cell = ws2.cell(row=row, column=1, value=label)
-        cell.font = Font(bold=True, color="FFFFFF")
-        cell.fill = HEADER_BG
-        cell.alignment = WRAP_CENTER
+    def _s2_header(label):
+        ws2.append([_cell(ws2, label, "nf_header_label"), ""])
 
-    ws2.append(["集計項目", "件数"])
-    _s2_header(1, "集計項目")
-    ws2.cell(row=1, column=2).font   = HEADER_FONT
-    ws2.cell(row=1, column=2).fill   = HEADER_BG
-    ws2.cell(row=1, column=2).alignment = WRAP_CENTER
+    ws2.append([_cell(ws2, "集計項目", "nf_header_label"), _cell(ws2, "件数", "nf_header")])
 
     ws2.append(["総ファイル数", len(records)])
     ws2.append(["正常抽出",     ok_count])
     ws2.append(["要確認",       rev_count])
     ws2.append([""])
 
-    ws2.append(["施設タグ別件数", ""])
-    _s2_header(ws2.max_row, "施設タグ別件数")
-    tag_fac: Dict[str, int] = {}
-    for r in records:
-        for t in r.tags_facility:
-            tag_fac[t] = tag_fac.get(t, 0) + 1
+    _s2_header("施設タグ別件数")
+    tag_fac = Counter(t for r in records for t in r.tags_facility)
     for t, c in sorted(tag_fac.items(), key=lambda x: -x[1]):
         ws2.append([t, c])
 
     ws2.append([""])
-    ws2.append(["業務タグ別件数", ""])
-    _s2_header(ws2.max_row, "業務タグ別件数")
-    tag_work: Dict[str, int] = {}
-    for r in records:
-        for t in r.tags_work:
-            tag_work[t] = tag_work.get(t, 0) + 1
+    _s2_header("業務タグ別件数")
+    tag_work = Counter(t for r in records for t in r.tags_work)
     for t, c in sorted(tag_work.items(), key=lambda x: -x[1]):
         ws2.append([t, c])
 
     ws2.append([""])
-    ws2.append(["要確認の理由別", ""])
-    _s2_header(ws2.max_row, "要確認の理由別")
-    reason_counts: Dict[str, int] = {}
-    for r in records:
-        if r.needs_review and r.reason:
-            reason_counts[r.reason] = reason_counts.get(r.reason, 0) + 1
+    _s2_header("要確認の理由別")
+    reason_counts = Counter(r.reason for r in records if r.needs_review and r.reason)
     for reason, cnt in sorted(reason_counts.items(), key=lambda x: -x[1]):
         ws2.append([reason, cnt])
 
-    ws2.column_dimensions["A"].width = 50
-    ws2.column_dimensions["B"].width = 10
-
     excel_path = os.path.join(outdir, "00_統合目次.xlsx")
     try:
         wb.save(excel_path)
@@ -1665,31 +2206,63 @@ def write_excel_index(outdir: str, records: List[Record]):
         raise PermissionError("00_統合目次.xlsx が他のアプリで開かれています。閉じてからやり直してください。")
 
 def write_md_indices(outdir: str, records: List[Record]):
+    # セクション見出しの件数（タイプごとの全件数）は1回の走査で数えておく
+    type_counts = Counter(r.doc_type for r in records)
+    # 本文はメモリ上で組み立て、ファイルへは最後に1回で書き出す
+    buf = io.StringIO()
+    buf.write("# 統合目次（法令・通知・マニュアル）\n\n")
+    current_type = ""
+    for r in records:
+        # タイプが変わったらセクション見出しを出力
+        if r.doc_type != current_type:
+            current_type = r.doc_type
+            buf.write(f"## {current_type}（{type_counts[current_type]}件）\n\n")
+
+        laws_str = f"\n  - 関連法令: {', '.join(r.related_laws)}" if r.related_laws else ""
+        amend_str = f"\n  - 改廃: {', '.join(r.amendments)}" if r.amendments else ""
+        ocr_str = f"\n  - OCR品質: {r.ocr_quality:.0%}" if r.ocr_quality < 1.0 else ""
+        buf.write(
+            f"- **[{r.doc_type}] {r.title_guess}**\n"
+            f"  - 日付: {r.date_guess} / 発出: {r.issuer_guess}\n"
+            f"  - タグ: [{'/'.join(r.tags_facility)}] [{'/'.join(r.tags_work)}]"
+            f"{laws_str}{amend_str}{ocr_str}\n"
+            f"  - 概要: {r.summary}\n"
+            f"  - 元: `{r.relpath}`\n\n"
+        )
     with open(os.path.join(outdir, "00_統合目次.md"), "w", encoding="utf-8") as f:
-        f.write("# 統合目次（法令・通知・マニュアル）\n\n")
-        current_type = ""
-        for r in records:
-            # タイプが変わったらセクション見出しを出力
-            if r.doc_type != current_type:
-                current_type = r.doc_type
-                type_counts = sum(1 for x in records if x.doc_type == current_type)
-                f.write(f"## {current_type}（{type_counts}件）\n\n")
-
-            laws_str = f"\n  - 関連法令: {', '.join(r.related_laws)}" if r.related_laws else ""
-            amend_str = f"\n  - 改廃: {', '.join(r.amendments)}" if r.amendments else ""
-            ocr_str = f"\n  - OCR品質: {r.ocr_quality:.0%}" if r.ocr_quality < 1.0 else ""
-            f.write(
-                f"- **[{r.doc_type}] {r.title_guess}**\n"
-                f"  - 日付: {r.date_guess} / 発出: {r.issuer_guess}\n"
-                f"  - タグ: [{'/'.join(r.tags_facility)}] [{'/'.join(r.tags_work)}]"
-                f"{laws_str}{amend_str}{ocr_str}\n"
-                f"  - 概要: {r.summary}\n"
-                f"  - 元: `{r.relpath}`\n\n"
-            )
+        f.write(buf.getvalue())
+
+_BIND_NEWLINE = os.linesep.encode("ascii")
+_BIND_RULE = "=" * 60
+_BIND_SUBRULE = "-" * 60
+
+
+def _write_vectored(f, parts: List[bytes]) -> None:
+    """複数のバッファを連結せずに書き出す。
+    os.writev がある環境（POSIX）では1回のシステムコールでまとめて渡し、部分書き込みは続きから再送する。
+    ない環境（Windows）では通常の writelines に任せる。"""
+    writev = getattr(os, "writev", None)
+    if writev is None:
+        f.writelines(parts)
+        return
+    f.flush()
+    fd = f.fileno()
+    views = [memoryview(b) for b in parts if b]
+    while views:
+        n = writev(fd, views)
+        while n:
+            head = len(views[0])
+            if n >= head:
+                n -= head
+                views.pop(0)
+            else:
+                views[0] = views[0][n:]
+                n = 0
 
-def write_binded_texts(outdir: str, records: List[Record], limit_bytes: int):
+def write_binded_texts(outdir: str, records: List[Record], limit_bytes: int) -> List[str]:
     """文書タイプ別にNotebookLM用テキストを出力する。
-    法令→通知→マニュアルの順に、タイプ別ファイル名で出力。"""
+    法令→通知→マニュアルの順に、タイプ別ファイル名で出力。書き出したファイルのパスを返す。"""
+    written: List[str] = []
 
     # タイプ別にグループ化（出力順: 法令 → 通知 → マニュアル）
     type_order = {"法令": 1, "通知": 2, "マニュアル": 3}
@@ -1706,48 +2279,120 @@ def write_binded_texts(outdir: str, records: List[Record], limit_bytes: int):
             continue
 
         prefix = type_prefixes[doc_type]
-        chunk_idx = 1
+        chunk_idx = 0
         current_size = 0
-        current_blocks: List[str] = []
         doc_num = 0
+        # 文書ブロックは溜め込まずに出力ファイルへ直接書き、上限を超える手前で次のファイルに切り替える
+        f = None
+        try:
+            for r in group_records:
+                # 空白だけの本文は除外する（strip() の全文コピーを避け、isspace() で先頭から判定）
+                if not r.full_text_for_bind or r.full_text_for_bind.isspace():
+                    continue
+                doc_num += 1
+
+                # 見出し・本文・末尾は連結せず別々に UTF-8 化し、サイズ判定と書き出しの両方に使う
+                # （本文全体のコピーを1回減らす。テキストモードと同じく改行はOSの形式にそろえる）
+                head = (
+                    f"\n\n{_BIND_RULE}\n"
+                    f"【文書 No.{doc_num}】\n"
+                    f"元ファイル: {r.relpath}\n"
+                    f"{_BIND_SUBRULE}\n"
+                )
+                body = r.full_text_for_bind
+                tail = f"\n{_BIND_RULE}\n\n"
+                if _BIND_NEWLINE != b"\n":
+                    head = head.replace("\n", os.linesep)
+                    body = body.replace("\n", os.linesep)
+                    tail = tail.replace("\n", os.linesep)
+                parts = [head.encode("utf-8"), body.encode("utf-8"), tail.encode("utf-8")]
+                b_len = len(parts[0]) + len(parts[1]) + len(parts[2])
+                if f is not None and current_size + b_len > limit_bytes:
+                    f.close()
+                    f = None
+                if f is None:
+                    chunk_idx += 1
+                    out_path = os.path.join(outdir, f"NotebookLM用_{prefix}_{chunk_idx:02d}.txt")
+                    f = open(out_path, "wb")
+                    written.append(out_path)
+                    current_size = 0
+                else:
+                    parts.insert(0, _BIND_NEWLINE)  # ブロック間の区切り
+                _write_vectored(f, parts)
+                current_size += b_len
+        finally:
+            if f is not None:
+                f.close()
+    return written
+
+
+def _copy_file_fast(src: str, dst: str) -> int:
+    """shutil.copy2 と同じく内容と更新日時等をコピーし、コピー先のバイト数を返す。
+    os.copy_file_range が使える環境（Linux）ではカーネル内でコピーし、対応するファイルシステムでは
+    リフリンク（btrfs/XFS）やサーバー側コピー（NFS）になる。使えない・元ファイルのサイズ分を
+    コピーしきれなかった場合（FUSE・CIFS 等は途中で 0 を返すことがある）は 1MB バッファの readinto で
+    最初からコピーし直し、それも失敗したら shutil.copy2 に任せる。"""
+    copy_range = getattr(os, "copy_file_range", None)
+    try:
+        with open(src, "rb", buffering=0) as fsrc, open(dst, "wb") as fdst:
+            size = os.fstat(fsrc.fileno()).st_size
+            copied = 0
+            if copy_range is not None:
+                in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+                try:
+                    while copied < size:
+                        n = copy_range(in_fd, out_fd, min(size - copied, 1 << 30))
+                        if not n:
+                            break  # 末尾の手前で 0 → readinto でやり直す
+                        copied += n
+                except OSError:
+                    pass  # 古いカーネル・ファイルシステム間コピー非対応など
+            if copied != size:
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+                copied = 0
+                buf = bytearray(1 << 20)
+                view = memoryview(buf)
+                while n := fsrc.readinto(buf):
+                    fdst.write(view[:n])
+                    copied += n
+        shutil.copystat(src, dst)
+        return copied
+    except OSError:
+        pass
+    shutil.copy2(src, dst)
+    return os.stat(dst).st_size
 
-        def flush(p=prefix, ci=[chunk_idx], cs=[current_size], cb=current_blocks):
-            if not cb:
-                return
-            fname = f"NotebookLM用_{p}_{ci[0]:02d}.txt"
-            with open(os.path.join(outdir, fname), "w", encoding="utf-8") as f:
-                f.write("\n".join(cb))
-            ci[0] += 1
-            cs[0] = 0
-            cb.clear()
-
-        for r in group_records:
-            if not r.full_text_for_bind.strip():
-                continue
-            doc_num += 1
-
-            block = (
-                f"\n\n{'='*60}\n"
-                f"【文書 No.{doc_num}】\n"
-                f"元ファイル: {r.relpath}\n"
-                f"{'-'*60}\n"
-                f"{r.full_text_for_bind}\n"
-                f"{'='*60}\n\n"
-            )
-            b_len = len(block.encode("utf-8"))
-            if current_size + b_len > limit_bytes and current_size > 0:
-                flush()
-            current_blocks.append(block)
-            current_size += b_len
-        flush()
+
+def _remove_source_copy_dirs(outdir: str) -> None:
+    """出力フォルダ内の「原本コピー*」フォルダをすべて削除する。
+    フォルダかどうかは列挙時の DirEntry の情報で判定し、複数フォルダの削除はスレッドで並行させる。"""
+    try:
+        with os.scandir(outdir) as it:
+            dirs = [e.path for e in it if e.name.startswith("原本コピー") and e.is_dir(follow_symlinks=False)]
+    except OSError:
+        return
+    if len(dirs) <= 1:
+        for d in dirs:
+            shutil.rmtree(d, ignore_errors=True)
+        return
+    with ThreadPoolExecutor(max_workers=min(len(dirs), _COPY_WORKERS)) as pool:
+        for d in dirs:
+            pool.submit(shutil.rmtree, d, ignore_errors=True)
 
 
+# 原本PDFの単体コピーを並行させるスレッド数（I/O待ちが中心なのでCPU数には依存させない）
+_COPY_WORKERS = 4
+# 原本コピーの対象にする拡張子（小文字）
+_COPYABLE_EXTS = frozenset({".pdf"})
+
 def copy_source_files_batched(
     indir: str,
     outdir: str,
     records: List[Record],
     slots_per_batch: int = 46,
-) -> Tuple[List[Tuple[str, List[str]]], List[Tuple[str, str]]]:
+) -> Tuple[List[Tuple[str, List[str], int]], List[Tuple[str, str]]]:
     """原本PDFを複数のバッチフォルダに分割してコピーする（全件対応）。
 
     NotebookLMの制限（50MB/件・250MB/ノートブック・50件制限）を守りながら、
@@ -1759,26 +2404,27 @@ def copy_source_files_batched(
       - 可能な環境では小容量PDFを統合し、ファイル数を圧縮（内容は非圧縮・無加工）
 
     戻り値:
-      batches: [(batch_dir, [file_paths]), ...] バッチごとの (フォルダ, ファイルリスト)
+      batches: [(batch_dir, [file_paths], total_bytes), ...] バッチごとの (フォルダ, ファイルリスト, 合計バイト数)
       skipped: [(relpath, 理由), ...] スキップしたファイルのリスト
     """
     MAX_FILE_BYTES  = 50  * 1024 * 1024   # 50MB / ファイル
     MAX_BATCH_BYTES = 250 * 1024 * 1024   # 250MB / バッチ
 
-    COPYABLE_EXTS = {".pdf"}
-
     # 統合PDFの上限（NotebookLMの1ファイル制限より少し小さめ）
     MERGE_TARGET_BYTES = 45 * 1024 * 1024
     MERGE_MAX_INPUTS = 12
 
+    # PDFの統合に使う（PDFが1件もなければ PyMuPDF は読み込まない）
+    fitz = _load_fitz() if any(r.ext.lower() == ".pdf" for r in records) else None
+
     # 前回の原本コピーフォルダをすべて削除して再生成
-    for entry in os.listdir(outdir):
-        if entry.startswith("原本コピー") and os.path.isdir(os.path.join(outdir, entry)):
-            shutil.rmtree(os.path.join(outdir, entry), ignore_errors=True)
+    _remove_source_copy_dirs(outdir)
 
-    batches:  List[Tuple[str, List[str]]] = []
+    batches:  List[Tuple[str, List[str], int]] = []
     skipped:  List[Tuple[str, str]]       = []
     used_names: set = set()
+    # 名前が重複したときの連番は前回の続きから試す（同名が多数あっても 1 から数え直さない）
+    next_counter: Dict[str, int] = {}
 
     current_dir:   Optional[str]   = None
     current_files: List[str]       = []
@@ -1788,7 +2434,7 @@ def copy_source_files_batched(
     def _flush():
         nonlocal current_dir, current_files, current_bytes
         if current_dir and current_files:
-            batches.append((current_dir, current_files[:]))
+            batches.append((current_dir, current_files[:], current_bytes))
         current_dir   = None
         current_files = []
         current_bytes = 0
@@ -1808,19 +2454,27 @@ def copy_source_files_batched(
         safe_name = name.replace(os.sep, "_").replace("/", "_")
         base, ext = os.path.splitext(safe_name)
         candidate = safe_name
-        counter = 1
-        while candidate in used_names:
+        if candidate in used_names:
+            counter = next_counter.get(safe_name, 1)
             candidate = f"{base}_{counter}{ext}"
-            counter += 1
+            while candidate in used_names:
+                counter += 1
+                candidate = f"{base}_{counter}{ext}"
+            next_counter[safe_name] = counter
         used_names.add(candidate)
         return candidate
 
-    def _can_merge(r: Record, file_size: int) -> bool:
+    def _can_merge(ext: str, file_size: int) -> bool:
         # fitz が使える環境のみ統合。大きめPDFは単体のまま保持して見通しを確保。
-        return bool(fitz) and file_size <= 15 * 1024 * 1024 and r.ext.lower() == ".pdf"
+        return bool(fitz) and file_size <= 15 * 1024 * 1024 and ext == ".pdf"
 
     merge_group: List[Tuple[Record, str, int]] = []
 
+    # 単体コピーはバッチ・コピー先の割り当てだけをこのスレッドで行い、コピー自体はスレッドで並行させる。
+    # 失敗したコピーは全件の完了後にバッチから外し、スキップとして記録する。
+    copy_pool = ThreadPoolExecutor(max_workers=_COPY_WORKERS, thread_name_prefix="copy")
+    copy_jobs: List[Tuple[Future, str, str, int]] = []  # (future, dst, relpath, file_size)
+
     def _emit_single(src: str, relpath: str, file_size: int):
         nonlocal current_bytes
         if current_dir is None or len(current_files) >= slots_per_batch or current_bytes + file_size > MAX_BATCH_BYTES:
@@ -1828,11 +2482,13 @@ def copy_source_files_batched(
 
         dst = os.path.join(current_dir, _safe_dst_name(relpath))
         try:
-            shutil.copy2(get_safe_path(src), dst)
-            current_files.append(dst)
-            current_bytes += file_size
+            fut = copy_pool.submit(_copy_file_fast, src, dst)
         except Exception:
             skipped.append((relpath, "コピーに失敗"))
+            return
+        copy_jobs.append((fut, dst, relpath, file_size))
+        current_files.append(dst)
+        current_bytes += file_size
 
     def _emit_merged(group: List[Tuple[Record, str, int]]):
         nonlocal current_bytes
@@ -1857,7 +2513,7 @@ def copy_source_files_batched(
 
         try:
             for rec, src, _ in group:
-                part = fitz.open(get_safe_path(src))
+                part = fitz.open(src)
                 try:
                     start = merged_doc.page_count + 1
                     merged_doc.insert_pdf(part)
@@ -1903,30 +2559,73 @@ def copy_source_files_batched(
             _emit_merged(merge_group)
             merge_group = []
 
-    for r in records:
-        if r.ext.lower() not in COPYABLE_EXTS:
-            continue
-        src = os.path.join(indir, r.relpath)
-        if not os.path.isfile(get_safe_path(src)):
-            continue
+    # 割り当て中に例外が出ても、投入済みのコピーは必ず完了を待ってから抜ける
+    try:
+        for r in records:
+            ext = r.ext.lower()
+            if ext not in _COPYABLE_EXTS:
+                continue
+            # 存在確認とサイズ取得は1回の stat で済ませ、変換済みのパスをコピー・統合でもそのまま使う
+            src = get_safe_path(os.path.join(indir, r.relpath))
+            try:
+                st = os.stat(src)
+            except (OSError, ValueError):
+                continue
+            if not S_ISREG(st.st_mode):
+                continue
+            file_size = st.st_size
 
-        file_size = os.path.getsize(get_safe_path(src))
+            # 50MB 超はどのバッチにも入れられない
+            if file_size > MAX_FILE_BYTES:
+                skipped.append((r.relpath, f"ファイルサイズ超過 ({file_size // (1024*1024)}MB > 50MB)"))
+                continue
+
+            if _can_merge(ext, file_size):
+                merge_group.append((r, src, file_size))
+                _flush_merge_group(force=False)
+            else:
+                _flush_merge_group(force=True)
+                _emit_single(src, r.relpath, file_size)
 
-        # 50MB 超はどのバッチにも入れられない
-        if file_size > MAX_FILE_BYTES:
-            skipped.append((r.relpath, f"ファイルサイズ超過 ({file_size // (1024*1024)}MB > 50MB)"))
+        _flush_merge_group(force=True)
+        _flush()
+    finally:
+        copy_pool.shutdown(wait=True)
+
+    # 例外で終わったコピーに加え、書けたバイト数が事前の stat のサイズと違うもの（途中で切れた・
+    # コピー中に元ファイルが変わった）も失敗として扱い、バッチから外してスキップに記録する
+    failed: Dict[str, int] = {}  # dst -> バッチの合計から差し引くバイト数
+    for fut, dst, relpath, file_size in copy_jobs:
+        if fut.exception() is None and fut.result() == file_size:
             continue
+        failed[dst] = file_size
+        skipped.append((relpath, "コピーに失敗"))
+        # 途中まで書かれたコピー先が残ると、投入ガイドどおりフォルダごとアップロードしたときに混ざる
+        try:
+            os.remove(get_safe_path(dst))
+        except OSError:
+            pass
+    if failed:
+        kept_batches: List[Tuple[str, List[str], int]] = []
+        for d, files, total in batches:
+            kept = [f for f in files if f not in failed]
+            if kept:
+                kept_batches.append((d, kept, total - sum(failed[f] for f in files if f in failed)))
+            else:
+                # 全件のコピーに失敗したバッチはフォルダも残さない（空のときだけ消える rmdir を使う）
+                try:
+                    os.rmdir(get_safe_path(d))
+                except OSError:
+                    pass
+        batches = kept_batches
+    return batches, skipped
 
-        if _can_merge(r, file_size):
-            merge_group.append((r, src, file_size))
-            _flush_merge_group(force=False)
-        else:
-            _flush_merge_group(force=True)
-            _emit_single(src, r.relpath, file_size)
 
-    _flush_merge_group(force=True)
-    _flush()
-    return batches, skipped
+def _write_lines(path: str, lines: List[str]) -> None:
+    """行のリストを改行区切りで書き出す（末尾に改行は付けない。"\n".join した文字列と同じ内容）。
+    全体を1つの文字列に結合せず、行と区切りを順にファイルのバッファへ渡す。"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(chain(lines[:1], chain.from_iterable(("\n", line) for line in lines[1:])))
 
 
 def write_notebook_preamble(
@@ -1943,9 +2642,7 @@ def write_notebook_preamble(
     pdf_records = [r for r in records if r.ext.lower() == ".pdf"]
     ocr_records = [r for r in pdf_records if r.ocr_quality < 1.0]
     type_order = ["法令", "通知", "マニュアル"]
-    type_counts: Dict[str, int] = {}
-    for r in records:
-        type_counts[r.doc_type] = type_counts.get(r.doc_type, 0) + 1
+    type_counts = Counter(r.doc_type for r in records)
 
     lines: List[str] = [
         "=" * 60,
@@ -2004,15 +2701,14 @@ def write_notebook_preamble(
     ]
 
     fpath = os.path.join(outdir, "00_はじめに_NotebookLM用.txt")
-    with open(fpath, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+    _write_lines(fpath, lines)
     return fpath
 
 
 def write_upload_guide(
     outdir: str,
     bundle_files: List[str],
-    batches: List[Tuple[str, List[str]]],
+    batches: List[Tuple[str, List[str], int]],
     skipped_files: Optional[List[Tuple[str, str]]] = None,
 ):
     """NotebookLMへの投入順序ガイドを生成する（00_投入ガイド.txt）。
@@ -2021,7 +2717,7 @@ def write_upload_guide(
     50件制限・50MB/件・250MB合計を守りながら全件を網羅できるよう案内する。
     """
     skipped_files = skipped_files or []
-    total_pdf = sum(len(files) for _, files in batches)
+    total_pdf = sum(len(files) for _, files, _ in batches)
     nb_count = len(batches) if batches else 1
 
     lines: List[str] = [
@@ -2044,11 +2740,10 @@ def write_upload_guide(
         lines.append(f"  ② {os.path.basename(f)}")
     lines += [""]
 
-    for i, (batch_dir, files) in enumerate(batches, start=1):
+    for i, (batch_dir, files, batch_bytes) in enumerate(batches, start=1):
         batch_name = os.path.basename(batch_dir)
-        batch_mb = sum(
-            os.path.getsize(f) for f in files if os.path.isfile(f)
-        ) // (1024 * 1024)
+        # 合計サイズはコピー時に数えた値を使う（ファイルを stat し直さない）
+        batch_mb = batch_bytes // (1024 * 1024)
         lines += [
             f"◆ ノートブック {i}（原本PDF照合用）← {batch_name}/ フォルダ",
             f"  ファイル数: {len(files)}件  合計サイズ: 約{batch_mb}MB",
@@ -2070,9 +2765,7 @@ def write_upload_guide(
             lines.append(f"  スキップ: {os.path.basename(relpath)}  ({reason})")
         lines.append("")
 
-    fpath = os.path.join(outdir, "00_投入ガイド.txt")
-    with open(fpath, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+    _write_lines(os.path.join(outdir, "00_投入ガイド.txt"), lines)
 
 
 def write_cross_reference_map(outdir: str, records: List[Record]):
@@ -2112,6 +2805,27 @@ def write_cross_reference_map(outdir: str, records: List[Record]):
         lines.append("")
 
     # ── 通知→法令の参照関係 ──
+    # 参照先の法令文書は「キーワードのどれかを題名に含む最初の法令」。
+    # キーワードごとに最初に含む法令の位置を1回だけ調べ、同じ参照文字列の結果も使い回す
+    # （最初の法令 = 各キーワードの最初の位置のうち最小のもの）
+    law_titles = [lr.title_guess for lr in law_records]
+    first_law_with: Dict[str, Optional[int]] = {}
+    matched_by_ref: Dict[str, str] = {}
+
+    def _matched_law(law_ref: str) -> str:
+        matched = matched_by_ref.get(law_ref)
+        if matched is None:
+            hits = []
+            for keyword in _extract_law_keywords(law_ref):
+                if keyword not in first_law_with:
+                    first_law_with[keyword] = next(
+                        (i for i, t in enumerate(law_titles) if keyword in t), None)
+                if first_law_with[keyword] is not None:
+                    hits.append(first_law_with[keyword])
+            matched = f" → 収録済み: {law_titles[min(hits)]}" if hits else ""
+            matched_by_ref[law_ref] = matched
+        return matched
+
     if notice_records:
         lines.append("-" * 40)
         lines.append("■ 通知から法令への参照関係")
@@ -2121,12 +2835,7 @@ def write_cross_reference_map(outdir: str, records: List[Record]):
                 lines.append(f"  [{r.date_guess or '日付不明'}] {r.title_guess}")
                 for law_ref in r.related_laws:
                     # 参照先の法令文書が存在するか確認
-                    matched_law = ""
-                    for lr in law_records:
-                        if any(keyword in lr.title_guess for keyword in _extract_law_keywords(law_ref)):
-                            matched_law = f" → 収録済み: {lr.title_guess}"
-                            break
-                    lines.append(f"    → {law_ref}{matched_law}")
+                    lines.append(f"    → {law_ref}{_matched_law(law_ref)}")
                 if r.amendments:
                     for a in r.amendments:
                         lines.append(f"    [改廃] {a}")
@@ -2152,67 +2861,127 @@ def write_cross_reference_map(outdir: str, records: List[Record]):
         # 法令条文をキーにして通知をグループ化
         law_to_notices: Dict[str, List[str]] = {}
         for r in notice_records:
+            entry = f"{r.title_guess}（{r.date_guess or ''}）"
             for law_ref in r.related_laws:
-                if law_ref not in law_to_notices:
-                    law_to_notices[law_ref] = []
-                law_to_notices[law_ref].append(f"{r.title_guess}（{r.date_guess or ''}）")
+                law_to_notices.setdefault(law_ref, []).append(entry)
         for law_ref, notices in sorted(law_to_notices.items()):
             lines.append(f"  {law_ref}:")
             for notice_title in notices[:10]:
                 lines.append(f"    ← {notice_title}")
         lines.append("")
 
-    content = "\n".join(lines)
-    with open(os.path.join(outdir, "00_相互参照マップ.txt"), "w", encoding="utf-8") as f:
-        f.write(content)
+    _write_lines(os.path.join(outdir, "00_相互参照マップ.txt"), lines)
+
 
+_LAW_REF_KEYWORDS = ("消防法", "政令", "規則", "省令", "条例", "告示")
 
-def _extract_law_keywords(law_ref: str) -> List[str]:
+# 同じ参照文字列（「政令第3条」等）は文書をまたいで何度も現れるので結果をメモ化する
+@lru_cache(maxsize=2048)
+def _extract_law_keywords(law_ref: str) -> Tuple[str, ...]:
     """法令参照文字列からマッチング用キーワードを抽出する"""
-    keywords = []
-    for name in ["消防法", "政令", "規則", "省令", "条例", "告示"]:
-        if name in law_ref:
-            keywords.append(name)
-    return keywords if keywords else [law_ref[:4]]
+    keywords = tuple(name for name in _LAW_REF_KEYWORDS if name in law_ref)
+    return keywords if keywords else (law_ref[:4],)
 
 def compute_sha1(path: str) -> str:
     """ファイルのSHA1ハッシュを計算して重複ファイル検出に使う"""
     h = hashlib.sha1()
     try:
-        with open(get_safe_path(path), "rb") as f:
-            for chunk in iter(lambda: f.read(65536), b""):
-                h.update(chunk)
+        # 読み込みは自前で1MB単位に行うので、Python側のバッファリングは挟まない
+        with open(get_safe_path(path), "rb", buffering=0) as f:
+            # ファイル全体をmmapで一度に渡す（hashlibはバッファをそのまま読み、GILも解放する）
+            # 空ファイル・mmap不可（ネットワークドライブ等）の場合は大きめのチャンク読みに切替
+            try:
+                if os.fstat(f.fileno()).st_size > 0:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        h.update(mm)
+                    return h.hexdigest()
+            except (OSError, ValueError):
+                h = hashlib.sha1()
+                f.seek(0)
+            # チャンク読みは1つのバッファに readinto し、チャンクごとの bytes を作らない
+            buf = bytearray(1 << 20)
+            mv = memoryview(buf)
+            while n := f.readinto(buf):
+                h.update(mv[:n])
         return h.hexdigest()
     except Exception:
         return ""
 
+# 重複判定用のハッシュ計算はI/Oとハッシュ処理（GILを解放する）が中心なので、スレッドで先読みする
+_SHA1_WORKERS = max(1, min(8, (os.cpu_count() or 1) * 2))
+
+def _iter_sha1(paths: List[str]) -> Iterator[str]:
+    """paths の SHA1 を順に返す。先の数ファイル分はスレッドプールで並行して計算しておく。
+    先読みはワーカー数の2倍まで（読み込んだページキャッシュが抽出処理の前に追い出されないように）。
+    途中で close された場合（処理停止）は未着手の計算を取り消す。"""
+    if not paths:
+        return
+    pool = ThreadPoolExecutor(max_workers=_SHA1_WORKERS, thread_name_prefix="sha1")
+    try:
+        rest = iter(paths)
+        pending = deque(pool.submit(compute_sha1, p) for p in islice(rest, _SHA1_WORKERS * 2))
+        while pending:
+            fut = pending.popleft()
+            for p in islice(rest, 1):
+                pending.append(pool.submit(compute_sha1, p))
+            yield fut.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _read_bytes(path: str) -> Optional[bytes]:
+    """ファイル全体をバイト列で1回だけ読む（読めなければ None）。
+    文字コードの判定は読み込んだバイト列の decode で行い、候補ごとに開き直さない。"""
+    try:
+        with open(get_safe_path(path), "rb") as f:
+            return f.read()
+    except Exception:
+        return None
+
 def extract_txt(path: str) -> Tuple[str, str]:
     """プレーンテキストファイルを読み込む（文字コードを自動判定）"""
+    data = _read_bytes(path)
+    if data is None:
+        return "", "txt_err"
     for enc in ("utf-8-sig", "cp932", "utf-8", "latin-1"):
         try:
-            with open(get_safe_path(path), "r", encoding=enc, errors="ignore") as f:
-                return f.read(), "txt_read"
-        except Exception:
+            text = data.decode(enc, errors="ignore")
+        except UnicodeDecodeError:
             continue
+        # テキストモードで開いた場合と同じく改行を \n にそろえる
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text, "txt_read"
     return "", "txt_err"
 
 def extract_csv(path: str) -> Tuple[str, str]:
     """CSVファイルをMarkdown表形式に整形する"""
+    data = _read_bytes(path)
+    if data is None:
+        return "", "csv_err"
     for enc in ("utf-8-sig", "cp932", "utf-8"):
         try:
-            with open(get_safe_path(path), "r", encoding=enc, newline="", errors="ignore") as f:
-                rows = list(csv.reader(f))
+            # 出力するのは先頭400行だけなので、それ以降の行は解析しない
+            reader = csv.reader(io.StringIO(data.decode(enc, errors="ignore"), newline=""))
+            rows = list(islice(reader, 400))
             if not rows:
                 return "", "csv_empty"
             out = []
-            for row in rows[:400]:
-                if any(c.strip() for c in row):
-                    out.append("| " + " | ".join([c.strip().replace("\n", " ") for c in row]) + " |")
+            for row in rows:
+                cells = [c.strip() for c in row]  # 各セルの strip は1回だけ
+                if any(cells):
+                    out.append("| " + " | ".join([c.replace("\n", " ") for c in cells]) + " |")
             return "\n".join(out), "csv_md"
         except Exception:
             continue
     return "", "csv_err"
 
+# ── XML可読化用のパターン ──
+_XML_DECL_RE = re.compile(r"<\?xml[^>]*\?>", re.IGNORECASE)
+_XML_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_XML_TAG_RE = re.compile(r"<[^>]+>")
+_XML_HSPACE_RE = re.compile(r"[ \t\r\f\v]+")
+_XML_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+
 def extract_xml(path: str) -> Tuple[str, str]:
     """XMLファイルを読み込み、タグを除去した可読テキストを返す。"""
     raw = ""
@@ -2227,374 +2996,499 @@ def extract_xml(path: str) -> Tuple[str, str]:
         return "", "xml_err"
 
     # 最低限の可読化（タグ除去）
-    text = re.sub(r"<\?xml[^>]*\?>", "", raw, flags=re.IGNORECASE)
-    text = re.sub(r"<!--.*?-->", "", text, flags=re.DOTALL)
-    text = re.sub(r"<[^>]+>", " ", text)
+    text = _XML_DECL_RE.sub("", raw)
+    text = _XML_COMMENT_RE.sub("", text)
+    text = _XML_TAG_RE.sub(" ", text)
     text = _html.unescape(text)
-    text = re.sub(r"[ \t\r\f\v]+", " ", text)
-    text = re.sub(r"\n\s*\n+", "\n\n", text.replace("\r\n", "\n").replace("\r", "\n"))
+    text = _XML_HSPACE_RE.sub(" ", text)
+    text = _XML_BLANK_LINES_RE.sub("\n\n", text.replace("\r\n", "\n").replace("\r", "\n"))
     text = text.strip()
 
     if text:
         return text, "xml_text"
     return raw, "xml_raw"
 
-def write_html_report(outdir: str, records: List[Record]):
-    """人間が見やすいHTMLレポートを生成する（ブラウザで開くだけでOK）"""
-    def esc(s: object) -> str:
-        return _html.escape(str(s) if s is not None else "")
-
-    total       = len(records)
-    ok_count    = sum(1 for r in records if not r.needs_review)
-    needs_rev_count = total - ok_count
-    ok_pct      = round(ok_count    / total * 100) if total else 0
-    rev_pct     = round(needs_rev_count / total * 100) if total else 0
-
-    # ─── ファイル種別集計 ─────────────────────────────────────────
-    ext_label_map = {
-        ".pdf": "PDF", ".docx": "Word",
-        ".xlsx": "Excel", ".xlsm": "Excel", ".xls": "Excel",
-        ".xdw": "DocuWorks", ".xbd": "DocuWorks",
-        ".txt": "テキスト", ".csv": "CSV", ".xml": "XML",
-    }
-    ext_counts: Dict[str, int] = {}
-    for r in records:
-        lbl = ext_label_map.get(r.ext.lower(), f"その他({r.ext})")
-        ext_counts[lbl] = ext_counts.get(lbl, 0) + 1
-    ext_breakdown_parts = [
-        f'<span class="type-chip">{esc(lbl)} <b>{cnt}</b>件</span>'
-        for lbl, cnt in sorted(ext_counts.items(), key=lambda x: -x[1])
-    ]
-    ext_breakdown_html = "".join(ext_breakdown_parts)
-
-    # ─── 抽出方式集計（抽出方式別テーブル） ─────────────────────────
-    method_counts: Dict[str, int] = {}
-    for r in records:
-        method_counts[r.method] = method_counts.get(r.method, 0) + 1
-    method_rows = "".join(
-        f"<tr><td>{esc(m)}</td><td class='mcnt'>{c}</td></tr>"
-        for m, c in sorted(method_counts.items(), key=lambda x: -x[1])
-    )
-
-    # ─── 要確認の主要理由を集計 ─────────────────────────────────────
-    review_reasons: Dict[str, int] = {}
-    for r in records:
-        if r.needs_review and r.reason:
-            key = r.reason[:35] + ("…" if len(r.reason) > 35 else "")
-            review_reasons[key] = review_reasons.get(key, 0) + 1
-    review_reason_rows = "".join(
-        f'<li><span class="rr-count">{c}件</span> {esc(k)}</li>'
-        for k, c in sorted(review_reasons.items(), key=lambda x: -x[1])[:5]
-    )
 
-    # ─── 文書タイプ別集計 ────────────────────────────────────────────
-    dtype_counts: Dict[str, int] = {}
-    for r in records:
-        dtype_counts[r.doc_type] = dtype_counts.get(r.doc_type, 0) + 1
-    _dtype_css = {"法令": "law", "通知": "notice", "マニュアル": "manual"}
-    dtype_breakdown_parts = [
-        f'<span class="type-chip dtype-{_dtype_css.get(dt, "notice")}">{esc(dt)} <b>{cnt}</b>件</span>'
-        for dt, cnt in [("法令", dtype_counts.get("法令", 0)),
-                        ("通知", dtype_counts.get("通知", 0)),
-                        ("マニュアル", dtype_counts.get("マニュアル", 0))]
-        if cnt > 0
-    ]
-    dtype_breakdown_html = "".join(dtype_breakdown_parts)
-
-    # ─── バッジ色 ─────────────────────────────────────────────────
-    FAC_COLOR  = "#2563eb"
-    WORK_COLOR = "#16a34a"
-    def make_badge(text: str, color: str) -> str:
-        return f'<span class="badge" style="background:{color}">{esc(text)}</span>'
-
-    # ─── TOCアイテム生成 ─────────────────────────────────────────
-    toc_items_html: List[str] = []
-    for idx, r in enumerate(records):
-        toc_cls  = "toc-review" if r.needs_review else "toc-ok"
-        toc_icon = "⚠" if r.needs_review else "✓"
-        short_t  = r.title_guess[:40] + ("…" if len(r.title_guess) > 40 else "")
-        d_str    = r.date_guess or "日付不明"
-        tsearch  = (r.title_guess + " " + d_str).lower().replace('"', "")
-        toc_items_html.append(
-            f'<a href="#card-{idx}" class="toc-item {toc_cls}" data-search="{esc(tsearch)}">'
-            f'<span class="toc-icon">{toc_icon}</span>'
-            f'<span class="toc-body">'
-            f'<span class="toc-num">{idx + 1}.</span>'
-            f'<span class="toc-title">{esc(short_t)}</span>'
-            f'<span class="toc-date">{esc(d_str)}</span>'
-            f'</span></a>'
-        )
+# ── 抽出の振り分け・一括抽出 ──────────────────────────────
 
-    # ─── カード生成 ───────────────────────────────────────────────
-    cards_html: List[str] = []
-    for idx, r in enumerate(records):
-        card_cls  = "card-review" if r.needs_review else "card-ok"
-        rev_badge = '<span class="rev-badge">⚠ 要確認</span>' if r.needs_review else \
-                    '<span class="ok-badge">✓ 正常</span>'
-        fac_badges  = "".join(make_badge(t, FAC_COLOR)  for t in r.tags_facility)
-        work_badges = "".join(make_badge(t, WORK_COLOR) for t in r.tags_work)
-        tags_html   = (fac_badges + work_badges) or \
-                      '<span style="color:#94a3b8;font-size:12px">タグなし</span>'
-        date_str   = esc(r.date_guess)   or "日付不明"
-        issuer_str = esc(r.issuer_guess) or "発出者不明"
-        pages_str  = f"/{r.pages}p" if r.pages else ""
-        size_kb    = f"{r.size // 1024:,} KB" if r.size >= 1024 else f"{r.size} B"
-        reason_html = (
-            f'<div class="reason-box">⚠ {esc(r.reason)}</div>' if r.reason else ""
-        )
-
-        # 文書タイプバッジ
-        dtype_cls = {"法令": "dtype-law", "通知": "dtype-notice", "マニュアル": "dtype-manual"}.get(r.doc_type, "dtype-notice")
-        dtype_badge_html = f'<span class="dtype-badge {dtype_cls}">{esc(r.doc_type)}</span>'
-
-        # OCR品質バッジ（OCR処理したファイルのみ表示）
-        ocr_badge_html = ""
-        if r.ocr_quality < 1.0:
-            if r.ocr_quality >= 0.6:
-                ocr_badge_html = f'<span class="ocr-badge ocr-ok">OCR品質: {r.ocr_quality:.0%}</span>'
-            elif r.ocr_quality >= 0.35:
-                ocr_badge_html = f'<span class="ocr-badge ocr-warn">OCR品質: {r.ocr_quality:.0%}</span>'
-            else:
-                ocr_badge_html = f'<span class="ocr-badge ocr-bad">OCR品質: {r.ocr_quality:.0%}</span>'
-
-        # 改廃情報（検出された場合のみ）
-        amend_html = ""
-        if r.amendments:
-            amend_items = "".join(f'<span class="amend-chip">{esc(a)}</span>' for a in r.amendments[:3])
-            amend_html = f'<div class="amend-row">改廃: {amend_items}</div>'
-
-        # 関連法令（検出された場合のみ）
-        laws_html = ""
-        if r.related_laws:
-            law_items = "".join(f'<span class="law-chip">{esc(l)}</span>' for l in r.related_laws[:5])
-            laws_html = f'<div class="law-row">関連法令: {law_items}</div>'
-
-        search_data = " ".join([
-            r.title_guess, r.summary, r.relpath,
-            r.date_guess, r.issuer_guess, r.doc_type,
-            " ".join(r.tags_facility), " ".join(r.tags_work),
-            " ".join(r.related_laws), " ".join(r.amendments),
-            r.reason, r.method,
-        ]).replace('"', '')
-        summary_html = (esc(r.summary)
-                        or '<i style="color:#94a3b8">本文を抽出できませんでした</i>')
-        cards_html.append(f"""
-<div id="card-{idx}" class="card {card_cls}" data-search="{esc(search_data.lower())}">
-  <div class="card-header">
-    <div class="card-title">{esc(r.title_guess)}</div>
-    <div class="card-badges">{dtype_badge_html}{ocr_badge_html}{rev_badge}</div>
-  </div>
-  <div class="meta">
-    <span>📅 {date_str}</span>
-    <span>🏢 {issuer_str}</span>
-    <span>📄 {esc(r.ext.upper().lstrip('.'))}{pages_str} · {size_kb}</span>
-    <span class="method-tag">抽出: {esc(r.method)}</span>
-  </div>
-  <div class="tags">{tags_html}</div>
-  {amend_html}
-  {laws_html}
-  <div class="summary">{summary_html}</div>
-  <div class="filepath">📁 {esc(r.relpath)}</div>
-  {reason_html}
-</div>""")
+def _extract_one(path: str, use_ocr: bool) -> Tuple[str, Optional[int], str, str]:
+    """拡張子に応じた抽出関数を呼び、(本文, ページ数, 抽出方法, 理由) を返す。
+    抽出中の例外は method="error" と理由に変換する（呼び出し側には投げない）。"""
+    ext = os.path.splitext(path)[1].lower()
+    text, method, reason, pages = "", "unhandled", "", None
+    try:
+        if ext == ".pdf":
+            text, pages, method = extract_pdf(path, use_ocr)
+        elif ext == ".docx":
+            text, method = extract_docx(path)
+        elif ext in (".xlsx", ".xlsm", ".xls"):
+            text, method = extract_excel(path)
+        elif ext in (".xdw", ".xbd"):
+            text, method = extract_xdw(path)
+        elif ext == ".txt":
+            text, method = extract_txt(path)
+        elif ext == ".csv":
+            text, method = extract_csv(path)
+        elif ext == ".xml":
+            text, method = extract_xml(path)
+    except Exception as e:
+        method, reason = "error", f"抽出エラー: {e.__class__.__name__}"
+    return text, pages, method, reason
 
-    gen_time = time.strftime('%Y年%m月%d日 %H:%M:%S')
 
-    html_content = f"""<!DOCTYPE html>
+# ── HTMLレポートの静的部分（CSS・スクリプト）は読込時に1回だけUTF-8化しておく ──
+_HTML_HEAD_BYTES = """<!DOCTYPE html>
 <html lang="ja">
 <head>
 <meta charset="UTF-8">
 <meta name="viewport" content="width=device-width,initial-scale=1.0">
 <title>NoticeForge 処理レポート</title>
 <style>
-*{{box-sizing:border-box;margin:0;padding:0}}
-body{{font-family:'Meiryo UI','Yu Gothic UI','Hiragino Sans',sans-serif;background:#f1f5f9;color:#1e293b;font-size:14px}}
+*{box-sizing:border-box;margin:0;padding:0}
+body{font-family:'Meiryo UI','Yu Gothic UI','Hiragino Sans',sans-serif;background:#f1f5f9;color:#1e293b;font-size:14px}
 
 /* ════════════════════════════════════
    左サイドバー（文書目次）
    ════════════════════════════════════ */
-.toc-sidebar{{
+.toc-sidebar{
   position:fixed;left:0;top:0;width:300px;height:100vh;
   background:#0f172a;color:#e2e8f0;
   display:flex;flex-direction:column;z-index:200;
   border-right:1px solid #1e3a5f;
-}}
-.toc-head{{
+}
+.toc-head{
   padding:14px 16px;font-size:14px;font-weight:bold;
   background:#1e3a8a;color:white;
   display:flex;align-items:center;gap:8px;flex-shrink:0;
-}}
-.toc-summary-row{{
+}
+.toc-summary-row{
   padding:8px 16px;font-size:12px;color:#94a3b8;
   background:#1e293b;border-bottom:1px solid #334155;flex-shrink:0;
   display:flex;gap:14px;
-}}
-.toc-ok-sum{{color:#4ade80;font-weight:bold}}
-.toc-rev-sum{{color:#f87171;font-weight:bold}}
-.toc-filter-wrap{{
+}
+.toc-ok-sum{color:#4ade80;font-weight:bold}
+.toc-rev-sum{color:#f87171;font-weight:bold}
+.toc-filter-wrap{
   padding:8px 12px;background:#1e293b;
   border-bottom:1px solid #334155;flex-shrink:0;
-}}
-.toc-filter{{
+}
+.toc-filter{
   width:100%;padding:6px 10px;border-radius:6px;
   border:1px solid #334155;background:#0f172a;
   color:#e2e8f0;font-size:12px;font-family:inherit;outline:none;
-}}
-.toc-filter:focus{{border-color:#3b82f6}}
-.toc-nav{{flex:1;overflow-y:auto;padding:4px 0}}
-.toc-nav::-webkit-scrollbar{{width:4px}}
-.toc-nav::-webkit-scrollbar-thumb{{background:#334155;border-radius:2px}}
-.toc-item{{
+}
+.toc-filter:focus{border-color:#3b82f6}
+.toc-nav{flex:1;overflow-y:auto;padding:4px 0}
+.toc-nav::-webkit-scrollbar{width:4px}
+.toc-nav::-webkit-scrollbar-thumb{background:#334155;border-radius:2px}
+.toc-item{
   display:flex;align-items:flex-start;gap:8px;
   padding:7px 14px;text-decoration:none;color:#cbd5e1;
   font-size:12px;line-height:1.4;
   border-left:3px solid transparent;
   transition:background .15s,border-color .15s;
-}}
-.toc-item:hover{{background:#1e293b;color:white}}
-.toc-item.active{{background:#1e3a8a;border-left-color:#60a5fa;color:white}}
-.toc-icon{{font-size:11px;flex-shrink:0;margin-top:1px;width:14px;text-align:center}}
-.toc-ok   .toc-icon{{color:#4ade80}}
-.toc-review .toc-icon{{color:#f87171}}
-.toc-body{{display:flex;flex-direction:column;min-width:0;flex:1}}
-.toc-num{{color:#64748b;font-size:10px}}
-.toc-title{{font-size:12px;color:inherit;white-space:normal;overflow:hidden;display:-webkit-box;-webkit-line-clamp:2;-webkit-box-orient:vertical}}
-.toc-date{{font-size:10px;color:#64748b;margin-top:1px}}
-.toc-item.toc-hidden{{display:none}}
-.toc-empty{{padding:16px;font-size:12px;color:#475569;text-align:center}}
+}
+.toc-item:hover{background:#1e293b;color:white}
+.toc-item.active{background:#1e3a8a;border-left-color:#60a5fa;color:white}
+.toc-icon{font-size:11px;flex-shrink:0;margin-top:1px;width:14px;text-align:center}
+.toc-ok   .toc-icon{color:#4ade80}
+.toc-review .toc-icon{color:#f87171}
+.toc-body{display:flex;flex-direction:column;min-width:0;flex:1}
+.toc-num{color:#64748b;font-size:10px}
+.toc-title{font-size:12px;color:inherit;white-space:normal;overflow:hidden;display:-webkit-box;-webkit-line-clamp:2;-webkit-box-orient:vertical}
+.toc-date{font-size:10px;color:#64748b;margin-top:1px}
+.toc-item.toc-hidden{display:none}
+.toc-empty{padding:16px;font-size:12px;color:#475569;text-align:center}
 
 /* ════════════════════════════════════
    メインコンテンツ
    ════════════════════════════════════ */
-.main-wrapper{{margin-left:300px}}
+.main-wrapper{margin-left:300px}
 
 /* ─── ページヘッダー ─── */
-.page-header{{
+.page-header{
   background:linear-gradient(135deg,#1e40af,#2563eb);
   color:white;padding:20px 32px;
   display:flex;justify-content:space-between;align-items:flex-end;
   flex-wrap:wrap;gap:8px;
-}}
-.page-header h1{{font-size:22px;font-weight:bold}}
-.page-header .sub{{opacity:.75;font-size:12px;margin-top:4px}}
+}
+.page-header h1{font-size:22px;font-weight:bold}
+.page-header .sub{opacity:.75;font-size:12px;margin-top:4px}
 
 /* ─── 処理概要セクション ─── */
-.overview-section{{
+.overview-section{
   background:white;border-bottom:1px solid #e2e8f0;padding:20px 32px 16px;
-}}
-.overview-title{{
+}
+.overview-title{
   font-size:13px;font-weight:bold;color:#64748b;
   text-transform:uppercase;letter-spacing:.05em;margin-bottom:14px;
-}}
-.stats-row{{display:flex;gap:12px;flex-wrap:wrap;margin-bottom:16px;align-items:stretch}}
-.stat-box{{
+}
+.stats-row{display:flex;gap:12px;flex-wrap:wrap;margin-bottom:16px;align-items:stretch}
+.stat-box{
   background:#f8fafc;border:1px solid #e2e8f0;border-radius:10px;
   padding:14px 24px;text-align:center;min-width:110px;
-}}
-.stat-box .num{{font-size:30px;font-weight:bold;color:#1e40af;line-height:1}}
-.stat-box .lbl{{font-size:11px;color:#64748b;margin-top:6px}}
-.stat-box .pct{{font-size:11px;color:#94a3b8;margin-top:2px}}
-.stat-box.warn .num{{color:#dc2626}}
-.stat-box.good .num{{color:#16a34a}}
-.overview-bottom{{display:flex;gap:24px;flex-wrap:wrap;align-items:flex-start}}
-.type-section{{flex:1;min-width:200px}}
-.type-label{{font-size:12px;color:#64748b;font-weight:bold;margin-bottom:8px}}
-.type-chips{{display:flex;gap:8px;flex-wrap:wrap}}
-.type-chip{{
+}
+.stat-box .num{font-size:30px;font-weight:bold;color:#1e40af;line-height:1}
+.stat-box .lbl{font-size:11px;color:#64748b;margin-top:6px}
+.stat-box .pct{font-size:11px;color:#94a3b8;margin-top:2px}
+.stat-box.warn .num{color:#dc2626}
+.stat-box.good .num{color:#16a34a}
+.overview-bottom{display:flex;gap:24px;flex-wrap:wrap;align-items:flex-start}
+.type-section{flex:1;min-width:200px}
+.type-label{font-size:12px;color:#64748b;font-weight:bold;margin-bottom:8px}
+.type-chips{display:flex;gap:8px;flex-wrap:wrap}
+.type-chip{
   background:#f1f5f9;border:1px solid #e2e8f0;border-radius:20px;
   padding:4px 12px;font-size:12px;color:#475569;
-}}
-.type-chip b{{color:#1e40af}}
-.method-section{{flex:1;min-width:180px}}
-.method-section table{{font-size:12px;border-collapse:collapse;width:100%}}
-.method-section td{{padding:3px 8px;border-bottom:1px solid #f1f5f9;color:#475569}}
-.method-section td.mcnt{{text-align:right;font-weight:bold;color:#1e40af}}
-.method-section tr:last-child td{{border-bottom:none}}
-.review-section{{flex:1;min-width:180px}}
-.review-reasons{{list-style:none;font-size:12px;color:#92400e}}
-.review-reasons li{{padding:2px 0;display:flex;align-items:baseline;gap:6px}}
-.rr-count{{
+}
+.type-chip b{color:#1e40af}
+.method-section{flex:1;min-width:180px}
+.method-section table{font-size:12px;border-collapse:collapse;width:100%}
+.method-section td{padding:3px 8px;border-bottom:1px solid #f1f5f9;color:#475569}
+.method-section td.mcnt{text-align:right;font-weight:bold;color:#1e40af}
+.method-section tr:last-child td{border-bottom:none}
+.review-section{flex:1;min-width:180px}
+.review-reasons{list-style:none;font-size:12px;color:#92400e}
+.review-reasons li{padding:2px 0;display:flex;align-items:baseline;gap:6px}
+.rr-count{
   background:#fee2e2;color:#dc2626;border-radius:4px;
   padding:1px 6px;font-weight:bold;font-size:11px;white-space:nowrap;flex-shrink:0;
-}}
-.guide-box{{
+}
+.guide-box{
   background:#eff6ff;border:1px solid #bfdbfe;border-radius:8px;
   padding:10px 16px;font-size:12px;color:#1e40af;margin-top:14px;
   display:flex;align-items:flex-start;gap:8px;
-}}
-.guide-box strong{{font-weight:bold}}
+}
+.guide-box strong{font-weight:bold}
 
 /* ─── 検索バー（sticky）─── */
-.search-bar{{
+.search-bar{
   background:white;padding:10px 24px;border-bottom:1px solid #e2e8f0;
   display:flex;align-items:center;gap:10px;
   position:sticky;top:0;z-index:100;
   box-shadow:0 2px 6px rgba(0,0,0,.06);
-}}
-.search-input{{
+}
+.search-input{
   flex:1;max-width:680px;padding:9px 14px 9px 40px;
   border:2px solid #e2e8f0;border-radius:8px;
   font-size:13px;font-family:inherit;outline:none;
   transition:border-color .2s;
   background:url("data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' width='16' height='16' fill='none' stroke='%2394a3b8' stroke-width='2' viewBox='0 0 24 24'%3E%3Ccircle cx='11' cy='11' r='8'/%3E%3Cpath d='m21 21-4.35-4.35'/%3E%3C/svg%3E") no-repeat 12px center;
-}}
-.search-input:focus{{border-color:#2563eb}}
-.search-hint{{font-size:11px;color:#94a3b8}}
-.search-count{{font-size:13px;color:#64748b;font-weight:bold;white-space:nowrap;margin-left:auto}}
-.no-results{{text-align:center;padding:64px 16px;color:#94a3b8;font-size:15px;display:none}}
+}
+.search-input:focus{border-color:#2563eb}
+.search-hint{font-size:11px;color:#94a3b8}
+.search-count{font-size:13px;color:#64748b;font-weight:bold;white-space:nowrap;margin-left:auto}
+.no-results{text-align:center;padding:64px 16px;color:#94a3b8;font-size:15px;display:none}
 
 /* ─── カード ─── */
-.container{{max-width:1000px;margin:20px auto;padding:0 20px}}
-.card{{
+.container{max-width:1000px;margin:20px auto;padding:0 20px}
+.card{
   background:white;border-radius:10px;padding:18px 22px;margin-bottom:14px;
   border-left:5px solid #94a3b8;
   box-shadow:0 1px 4px rgba(0,0,0,.07);
   transition:box-shadow .2s;scroll-margin-top:56px;
-}}
-.card:hover{{box-shadow:0 3px 10px rgba(0,0,0,.12)}}
-.card.highlight{{outline:3px solid #3b82f6;outline-offset:2px}}
-.card-ok{{border-left-color:#16a34a}}
-.card-review{{border-left-color:#dc2626}}
-.card-header{{display:flex;justify-content:space-between;align-items:flex-start;gap:12px;margin-bottom:10px}}
-.card-title{{font-size:15px;font-weight:bold;color:#0f172a;line-height:1.5;flex:1}}
-.ok-badge{{background:#dcfce7;color:#16a34a;border:1px solid #86efac;border-radius:6px;padding:2px 10px;font-size:12px;font-weight:bold;white-space:nowrap}}
-.rev-badge{{background:#fee2e2;color:#dc2626;border:1px solid #fca5a5;border-radius:6px;padding:2px 10px;font-size:12px;font-weight:bold;white-space:nowrap}}
-.meta{{display:flex;gap:14px;flex-wrap:wrap;color:#64748b;font-size:12px;margin-bottom:10px}}
-.method-tag{{color:#94a3b8;font-size:11px}}
-.tags{{display:flex;gap:6px;flex-wrap:wrap;margin-bottom:12px}}
-.badge{{color:white;padding:2px 10px;border-radius:12px;font-size:12px;font-weight:500}}
-.summary{{
+}
+.card:hover{box-shadow:0 3px 10px rgba(0,0,0,.12)}
+.card.highlight{outline:3px solid #3b82f6;outline-offset:2px}
+.card-ok{border-left-color:#16a34a}
+.card-review{border-left-color:#dc2626}
+.card-header{display:flex;justify-content:space-between;align-items:flex-start;gap:12px;margin-bottom:10px}
+.card-title{font-size:15px;font-weight:bold;color:#0f172a;line-height:1.5;flex:1}
+.ok-badge{background:#dcfce7;color:#16a34a;border:1px solid #86efac;border-radius:6px;padding:2px 10px;font-size:12px;font-weight:bold;white-space:nowrap}
+.rev-badge{background:#fee2e2;color:#dc2626;border:1px solid #fca5a5;border-radius:6px;padding:2px 10px;font-size:12px;font-weight:bold;white-space:nowrap}
+.meta{display:flex;gap:14px;flex-wrap:wrap;color:#64748b;font-size:12px;margin-bottom:10px}
+.method-tag{color:#94a3b8;font-size:11px}
+.tags{display:flex;gap:6px;flex-wrap:wrap;margin-bottom:12px}
+.badge{color:white;padding:2px 10px;border-radius:12px;font-size:12px;font-weight:500}
+.summary{
   background:#f8fafc;border:1px solid #e2e8f0;border-radius:6px;
   padding:10px 14px;font-size:13px;line-height:1.8;color:#334155;
   max-height:160px;overflow-y:auto;margin-bottom:10px;white-space:pre-wrap;
-}}
-.filepath{{font-size:11px;color:#94a3b8;font-family:'Consolas','Courier New',monospace;word-break:break-all}}
-.reason-box{{margin-top:8px;font-size:12px;color:#92400e;background:#fffbeb;border:1px solid #fde68a;border-radius:5px;padding:6px 12px}}
-.card-badges{{display:flex;gap:6px;align-items:center;flex-shrink:0}}
-.ocr-badge{{border-radius:6px;padding:2px 8px;font-size:11px;font-weight:bold;white-space:nowrap}}
-.ocr-ok{{background:#dcfce7;color:#16a34a;border:1px solid #86efac}}
-.ocr-warn{{background:#fef3c7;color:#d97706;border:1px solid #fcd34d}}
-.ocr-bad{{background:#fee2e2;color:#dc2626;border:1px solid #fca5a5}}
-.amend-row,.law-row{{font-size:12px;color:#475569;margin-bottom:8px;display:flex;gap:6px;flex-wrap:wrap;align-items:center}}
-.amend-chip{{background:#fef3c7;color:#92400e;border:1px solid #fde68a;border-radius:4px;padding:1px 8px;font-size:11px}}
-.law-chip{{background:#ede9fe;color:#6d28d9;border:1px solid #c4b5fd;border-radius:4px;padding:1px 8px;font-size:11px}}
-.dtype-badge{{border-radius:6px;padding:2px 10px;font-size:11px;font-weight:bold;white-space:nowrap}}
-.dtype-law{{background:#dbeafe;color:#1d4ed8;border:1px solid #93c5fd}}
-.dtype-notice{{background:#f0fdf4;color:#15803d;border:1px solid #86efac}}
-.dtype-manual{{background:#fef3c7;color:#92400e;border:1px solid #fcd34d}}
+}
+.filepath{font-size:11px;color:#94a3b8;font-family:'Consolas','Courier New',monospace;word-break:break-all}
+.reason-box{margin-top:8px;font-size:12px;color:#92400e;background:#fffbeb;border:1px solid #fde68a;border-radius:5px;padding:6px 12px}
+.card-badges{display:flex;gap:6px;align-items:center;flex-shrink:0}
+.ocr-badge{border-radius:6px;padding:2px 8px;font-size:11px;font-weight:bold;white-space:nowrap}
+.ocr-ok{background:#dcfce7;color:#16a34a;border:1px solid #86efac}
+.ocr-warn{background:#fef3c7;color:#d97706;border:1px solid #fcd34d}
+.ocr-bad{background:#fee2e2;color:#dc2626;border:1px solid #fca5a5}
+.amend-row,.law-row{font-size:12px;color:#475569;margin-bottom:8px;display:flex;gap:6px;flex-wrap:wrap;align-items:center}
+.amend-chip{background:#fef3c7;color:#92400e;border:1px solid #fde68a;border-radius:4px;padding:1px 8px;font-size:11px}
+.law-chip{background:#ede9fe;color:#6d28d9;border:1px solid #c4b5fd;border-radius:4px;padding:1px 8px;font-size:11px}
+.dtype-badge{border-radius:6px;padding:2px 10px;font-size:11px;font-weight:bold;white-space:nowrap}
+.dtype-law{background:#dbeafe;color:#1d4ed8;border:1px solid #93c5fd}
+.dtype-notice{background:#f0fdf4;color:#15803d;border:1px solid #86efac}
+.dtype-manual{background:#fef3c7;color:#92400e;border:1px solid #fcd34d}
 
 /* ─── フッター ─── */
-.footer{{text-align:center;color:#94a3b8;font-size:11px;padding:24px;margin-top:8px}}
+.footer{text-align:center;color:#94a3b8;font-size:11px;padding:24px;margin-top:8px}
 
 /* ─── レスポンシブ（狭い画面では目次非表示） ─── */
-@media(max-width:900px){{
-  .toc-sidebar{{display:none}}
-  .main-wrapper{{margin-left:0}}
-}}
+@media(max-width:900px){
+  .toc-sidebar{display:none}
+  .main-wrapper{margin-left:0}
+}
 </style>
 </head>
 <body>
+""".encode("utf-8")
+
+_HTML_TAIL_BYTES = """<script>
+/* ── カード検索 ── */
+function filterCards() {
+  var q = document.getElementById('searchInput').value.toLowerCase();
+  var cards = document.querySelectorAll('.card');
+  var shown = 0;
+  cards.forEach(function(card) {
+    var match = !q || card.getAttribute('data-search').includes(q);
+    card.style.display = match ? '' : 'none';
+    if (match) shown++;
+  });
+  var countEl = document.getElementById('searchCount');
+  var noRes   = document.getElementById('noResults');
+  countEl.textContent = q ? (shown + ' 件 / ' + cards.length + ' 件中') : (cards.length + ' 件');
+  noRes.style.display  = (q && shown === 0) ? 'block' : 'none';
+}
+
+/* ── 目次絞り込み ── */
+function filterToc() {
+  var q = document.getElementById('tocFilter').value.toLowerCase();
+  var items = document.querySelectorAll('.toc-item');
+  var shown = 0;
+  items.forEach(function(a) {
+    var match = !q || a.getAttribute('data-search').includes(q);
+    a.classList.toggle('toc-hidden', !match);
+    if (match) shown++;
+  });
+  document.getElementById('tocEmpty').style.display = (q && shown === 0) ? 'block' : 'none';
+}
 
+/* ── スクロール連動でTOCをハイライト ── */
+(function() {
+  var tocItems = {};
+  document.querySelectorAll('.toc-item').forEach(function(a) {
+    var id = a.getAttribute('href').slice(1);
+    tocItems[id] = a;
+  });
+  var observer = new IntersectionObserver(function(entries) {
+    entries.forEach(function(entry) {
+      if (entry.isIntersecting) {
+        Object.values(tocItems).forEach(function(a) { a.classList.remove('active'); });
+        var active = tocItems[entry.target.id];
+        if (active) {
+          active.classList.add('active');
+          var nav = document.getElementById('tocNav');
+          if (nav) {
+            var offset = active.offsetTop - nav.offsetTop;
+            nav.scrollTop = offset - nav.clientHeight / 3;
+          }
+        }
+      }
+    });
+  }, { rootMargin: '-5% 0% -70% 0%', threshold: 0 });
+  document.querySelectorAll('.card').forEach(function(c) { observer.observe(c); });
+
+  /* ── 初期件数表示 ── */
+  document.getElementById('searchCount').textContent =
+    document.querySelectorAll('.card').length + ' 件';
+
+  /* ── TOCリンクをクリックしたときカードを一瞬ハイライト ── */
+  document.querySelectorAll('.toc-item').forEach(function(a) {
+    a.addEventListener('click', function() {
+      var id = a.getAttribute('href').slice(1);
+      var card = document.getElementById(id);
+      if (card) {
+        card.classList.add('highlight');
+        setTimeout(function() { card.classList.remove('highlight'); }, 1200);
+      }
+    });
+  });
+})();
+</script>
+</body>
+</html>""".encode("utf-8")
+
+# ── HTMLレポートの目次項目・カードのテンプレート（読込時に1回だけ定義し、レコードごとに差し込む） ──
+_HTML_TOC_ITEM_TMPL = (
+    '<a href="#card-{idx}" class="toc-item {toc_cls}" data-search="{search}">'
+    '<span class="toc-icon">{toc_icon}</span>'
+    '<span class="toc-body">'
+    '<span class="toc-num">{num}.</span>'
+    '<span class="toc-title">{title}</span>'
+    '<span class="toc-date">{date}</span>'
+    '</span></a>'
+)
+
+_HTML_CARD_TMPL = """
+<div id="card-{idx}" class="card {card_cls}" data-search="{search}">
+  <div class="card-header">
+    <div class="card-title">{title}</div>
+    <div class="card-badges">{badges}</div>
+  </div>
+  <div class="meta">
+    <span>📅 {date}</span>
+    <span>🏢 {issuer}</span>
+    <span>📄 {ext}{pages} · {size}</span>
+    <span class="method-tag">抽出: {method}</span>
+  </div>
+  <div class="tags">{tags}</div>
+  {amend}
+  {laws}
+  <div class="summary">{summary}</div>
+  <div class="filepath">📁 {relpath}</div>
+  {reason}
+</div>"""
+# カード内の小さな部品（該当しない項目は空文字のまま差し込む）
+_HTML_REV_BADGE = '<span class="rev-badge">⚠ 要確認</span>'
+_HTML_OK_BADGE = '<span class="ok-badge">✓ 正常</span>'
+_HTML_NO_TAGS = '<span style="color:#94a3b8;font-size:12px">タグなし</span>'
+_HTML_NO_SUMMARY = '<i style="color:#94a3b8">本文を抽出できませんでした</i>'
+_HTML_DTYPE_CLASSES = {"法令": "dtype-law", "通知": "dtype-notice", "マニュアル": "dtype-manual"}
+_HTML_DTYPE_BADGE_TMPL = '<span class="dtype-badge {cls}">{label}</span>'
+_HTML_OCR_BADGE_TMPL = '<span class="ocr-badge {cls}">OCR品質: {q:.0%}</span>'
+_HTML_REASON_TMPL = '<div class="reason-box">⚠ {reason}</div>'
+_HTML_AMEND_ROW_TMPL = '<div class="amend-row">改廃: {items}</div>'
+_HTML_AMEND_CHIP_TMPL = '<span class="amend-chip">{}</span>'
+_HTML_LAW_ROW_TMPL = '<div class="law-row">関連法令: {items}</div>'
+_HTML_LAW_CHIP_TMPL = '<span class="law-chip">{}</span>'
+
+def write_html_report(outdir: str, records: List[Record]):
+    """人間が見やすいHTMLレポートを生成する（ブラウザで開くだけでOK）"""
+    def esc(s: object) -> str:
+        s = str(s) if s is not None else ""
+        # 大半の項目（日本語のタイトル・概要等）はエスケープ対象の文字を含まないので、そのまま返す
+        # ※ str.translate による1パス置換は日本語文字列では html.escape より遅い
+        if "&" in s or "<" in s or ">" in s or '"' in s or "'" in s:
+            return _html.escape(s)
+        return s
+
+    total       = len(records)
+    ok_count    = sum(1 for r in records if not r.needs_review)
+    needs_rev_count = total - ok_count
+    ok_pct      = round(ok_count    / total * 100) if total else 0
+    rev_pct     = round(needs_rev_count / total * 100) if total else 0
+
+    # ─── ファイル種別集計 ─────────────────────────────────────────
+    ext_label_map = {
+        ".pdf": "PDF", ".docx": "Word",
+        ".xlsx": "Excel", ".xlsm": "Excel", ".xls": "Excel",
+        ".xdw": "DocuWorks", ".xbd": "DocuWorks",
+        ".txt": "テキスト", ".csv": "CSV", ".xml": "XML",
+    }
+    ext_counts = Counter(ext_label_map.get(r.ext.lower(), f"その他({r.ext})") for r in records)
+    ext_breakdown_parts = [
+        f'<span class="type-chip">{esc(lbl)} <b>{cnt}</b>件</span>'
+        for lbl, cnt in sorted(ext_counts.items(), key=lambda x: -x[1])
+    ]
+    ext_breakdown_html = "".join(ext_breakdown_parts)
+
+    # ─── 抽出方式集計（抽出方式別テーブル） ─────────────────────────
+    method_counts = Counter(r.method for r in records)
+    method_rows = "".join(
+        f"<tr><td>{esc(m)}</td><td class='mcnt'>{c}</td></tr>"
+        for m, c in sorted(method_counts.items(), key=lambda x: -x[1])
+    )
+
+    # ─── 要確認の主要理由を集計 ─────────────────────────────────────
+    review_reasons = Counter(
+        r.reason[:35] + ("…" if len(r.reason) > 35 else "")
+        for r in records if r.needs_review and r.reason)
+    review_reason_rows = "".join(
+        f'<li><span class="rr-count">{c}件</span> {esc(k)}</li>'
+        for k, c in sorted(review_reasons.items(), key=lambda x: -x[1])[:5]
+    )
+
+    # ─── 文書タイプ別集計 ────────────────────────────────────────────
+    dtype_counts = Counter(r.doc_type for r in records)
+    _dtype_css = {"法令": "law", "通知": "notice", "マニュアル": "manual"}
+    dtype_breakdown_parts = [
+        f'<span class="type-chip dtype-{_dtype_css.get(dt, "notice")}">{esc(dt)} <b>{cnt}</b>件</span>'
+        for dt, cnt in [("法令", dtype_counts.get("法令", 0)),
+                        ("通知", dtype_counts.get("通知", 0)),
+                        ("マニュアル", dtype_counts.get("マニュアル", 0))]
+        if cnt > 0
+    ]
+    dtype_breakdown_html = "".join(dtype_breakdown_parts)
+
+    # ─── バッジ色 ─────────────────────────────────────────────────
+    FAC_COLOR  = "#2563eb"
+    WORK_COLOR = "#16a34a"
+    def make_badge(text: str, color: str) -> str:
+        return f'<span class="badge" style="background:{color}">{esc(text)}</span>'
+
+    # ─── TOCアイテム生成 ─────────────────────────────────────────
+    # 目次・カードはリストに溜めず、ファイルへ書き出しながら1件ずつ生成する
+    def _toc_items() -> Iterator[str]:
+        for idx, r in enumerate(records):
+            toc_cls  = "toc-review" if r.needs_review else "toc-ok"
+            toc_icon = "⚠" if r.needs_review else "✓"
+            short_t  = r.title_guess[:40] + ("…" if len(r.title_guess) > 40 else "")
+            d_str    = r.date_guess or "日付不明"
+            tsearch  = (r.title_guess + " " + d_str).lower().replace('"', "")
+            yield _HTML_TOC_ITEM_TMPL.format_map({
+                "idx": idx, "num": idx + 1, "toc_cls": toc_cls, "toc_icon": toc_icon,
+                "search": esc(tsearch), "title": esc(short_t), "date": esc(d_str),
+            })
+
+    # ─── カード生成 ───────────────────────────────────────────────
+    def _cards() -> Iterator[str]:
+        for idx, r in enumerate(records):
+            card_cls  = "card-review" if r.needs_review else "card-ok"
+            rev_badge = _HTML_REV_BADGE if r.needs_review else _HTML_OK_BADGE
+            fac_badges  = "".join(make_badge(t, FAC_COLOR)  for t in r.tags_facility)
+            work_badges = "".join(make_badge(t, WORK_COLOR) for t in r.tags_work)
+            tags_html   = (fac_badges + work_badges) or _HTML_NO_TAGS
+            date_str   = esc(r.date_guess)   or "日付不明"
+            issuer_str = esc(r.issuer_guess) or "発出者不明"
+            pages_str  = f"/{r.pages}p" if r.pages else ""
+            size_kb    = f"{r.size // 1024:,} KB" if r.size >= 1024 else f"{r.size} B"
+            reason_html = _HTML_REASON_TMPL.format(reason=esc(r.reason)) if r.reason else ""
+
+            # 文書タイプバッジ
+            dtype_badge_html = _HTML_DTYPE_BADGE_TMPL.format(
+                cls=_HTML_DTYPE_CLASSES.get(r.doc_type, "dtype-notice"), label=esc(r.doc_type))
+
+            # OCR品質バッジ（OCR処理したファイルのみ表示）
+            ocr_badge_html = ""
+            q = r.ocr_quality
+            if q < 1.0:
+                ocr_cls = "ocr-ok" if q >= 0.6 else "ocr-warn" if q >= 0.35 else "ocr-bad"
+                ocr_badge_html = _HTML_OCR_BADGE_TMPL.format(cls=ocr_cls, q=q)
+
+            # 改廃情報（検出された場合のみ）
+            amend_html = ""
+            if r.amendments:
+                amend_items = "".join(_HTML_AMEND_CHIP_TMPL.format(esc(a)) for a in r.amendments[:3])
+                amend_html = _HTML_AMEND_ROW_TMPL.format(items=amend_items)
+
+            # 関連法令（検出された場合のみ）
+            laws_html = ""
+            if r.related_laws:
+                law_items = "".join(_HTML_LAW_CHIP_TMPL.format(esc(l)) for l in r.related_laws[:5])
+                laws_html = _HTML_LAW_ROW_TMPL.format(items=law_items)
+
+            search_data = " ".join([
+                r.title_guess, r.summary, r.relpath,
+                r.date_guess, r.issuer_guess, r.doc_type,
+                " ".join(r.tags_facility), " ".join(r.tags_work),
+                " ".join(r.related_laws), " ".join(r.amendments),
+                r.reason, r.method,
+            ]).replace('"', '')
+            summary_html = esc(r.summary) or _HTML_NO_SUMMARY
+            yield _HTML_CARD_TMPL.format_map({
+                "idx": idx, "card_cls": card_cls, "search": esc(search_data.lower()),
+                "title": esc(r.title_guess),
+                "badges": dtype_badge_html + ocr_badge_html + rev_badge,
+                "date": date_str, "issuer": issuer_str,
+                "ext": esc(r.ext.upper().lstrip('.')), "pages": pages_str, "size": size_kb,
+                "method": esc(r.method), "tags": tags_html,
+                "amend": amend_html, "laws": laws_html, "summary": summary_html,
+                "relpath": esc(r.relpath), "reason": reason_html,
+            })
+
+    gen_time = time.strftime('%Y年%m月%d日 %H:%M:%S')
+
+    body_top = f"""
 <!-- ════ 左サイドバー（文書目次）════ -->
 <aside class="toc-sidebar">
   <div class="toc-head">📋 文書目次</div>
@@ -2607,7 +3501,8 @@ body{{font-family:'Meiryo UI','Yu Gothic UI','Hiragino Sans',sans-serif;backgrou
       placeholder="目次を絞り込む…" oninput="filterToc()">
   </div>
   <nav class="toc-nav" id="tocNav">
-    {''.join(toc_items_html)}
+    """
+    body_mid = f"""
     <div class="toc-empty" id="tocEmpty" style="display:none">該当なし</div>
   </nav>
 </aside>
@@ -2677,7 +3572,8 @@ body{{font-family:'Meiryo UI','Yu Gothic UI','Hiragino Sans',sans-serif;backgrou
 
   <!-- カード一覧 -->
   <div class="container">
-    {''.join(cards_html)}
+    """
+    body_end = f"""
     <div class="no-results" id="noResults">
       該当するファイルが見つかりませんでした。別のキーワードを試してください。
     </div>
@@ -2686,83 +3582,178 @@ body{{font-family:'Meiryo UI','Yu Gothic UI','Hiragino Sans',sans-serif;backgrou
   <div class="footer">NoticeForge &mdash; NotebookLM 連携ツール &nbsp;|&nbsp; 生成: {gen_time}</div>
 </div>
 
-<script>
-/* ── カード検索 ── */
-function filterCards() {{
-  var q = document.getElementById('searchInput').value.toLowerCase();
-  var cards = document.querySelectorAll('.card');
-  var shown = 0;
-  cards.forEach(function(card) {{
-    var match = !q || card.getAttribute('data-search').includes(q);
-    card.style.display = match ? '' : 'none';
-    if (match) shown++;
-  }});
-  var countEl = document.getElementById('searchCount');
-  var noRes   = document.getElementById('noResults');
-  countEl.textContent = q ? (shown + ' 件 / ' + cards.length + ' 件中') : (cards.length + ' 件');
-  noRes.style.display  = (q && shown === 0) ? 'block' : 'none';
-}}
+"""
 
-/* ── 目次絞り込み ── */
-function filterToc() {{
-  var q = document.getElementById('tocFilter').value.toLowerCase();
-  var items = document.querySelectorAll('.toc-item');
-  var shown = 0;
-  items.forEach(function(a) {{
-    var match = !q || a.getAttribute('data-search').includes(q);
-    a.classList.toggle('toc-hidden', !match);
-    if (match) shown++;
-  }});
-  document.getElementById('tocEmpty').style.display = (q && shown === 0) ? 'block' : 'none';
-}}
+    with open(os.path.join(outdir, "00_人間用レポート.html"), "wb", buffering=1 << 20) as f:
+        f.write(_HTML_HEAD_BYTES)
+        f.write(body_top.encode("utf-8"))
+        f.writelines(item.encode("utf-8") for item in _toc_items())
+        f.write(body_mid.encode("utf-8"))
+        f.writelines(card.encode("utf-8") for card in _cards())
+        f.write(body_end.encode("utf-8"))
+        f.write(_HTML_TAIL_BYTES)
 
-/* ── スクロール連動でTOCをハイライト ── */
-(function() {{
-  var tocItems = {{}};
-  document.querySelectorAll('.toc-item').forEach(function(a) {{
-    var id = a.getAttribute('href').slice(1);
-    tocItems[id] = a;
-  }});
-  var observer = new IntersectionObserver(function(entries) {{
-    entries.forEach(function(entry) {{
-      if (entry.isIntersecting) {{
-        Object.values(tocItems).forEach(function(a) {{ a.classList.remove('active'); }});
-        var active = tocItems[entry.target.id];
-        if (active) {{
-          active.classList.add('active');
-          var nav = document.getElementById('tocNav');
-          if (nav) {{
-            var offset = active.offsetTop - nav.offsetTop;
-            nav.scrollTop = offset - nav.clientHeight / 3;
-          }}
-        }}
-      }}
-    }});
-  }}, {{ rootMargin: '-5% 0% -70% 0%', threshold: 0 }});
-  document.querySelectorAll('.card').forEach(function(c) {{ observer.observe(c); }});
 
-  /* ── 初期件数表示 ── */
-  document.getElementById('searchCount').textContent =
-    document.querySelectorAll('.card').length + ' 件';
+_REVIEW_FAIL_METHODS = frozenset({"unhandled", "error"})
+_REVIEW_TEXTLIKE_EXTS = frozenset({".xlsx", ".xlsm", ".xls", ".csv", ".txt", ".xml"})
 
-  /* ── TOCリンクをクリックしたときカードを一瞬ハイライト ── */
-  document.querySelectorAll('.toc-item').forEach(function(a) {{
-    a.addEventListener('click', function() {{
-      var id = a.getAttribute('href').slice(1);
-      var card = document.getElementById(id);
-      if (card) {{
-        card.classList.add('highlight');
-        setTimeout(function() {{ card.classList.remove('highlight'); }}, 1200);
-      }}
-    }});
-  }});
-}})();
-</script>
-</body>
-</html>"""
 
-    with open(os.path.join(outdir, "00_人間用レポート.html"), "w", encoding="utf-8") as f:
-        f.write(html_content)
+def _classify_review(method: str, ext: str, text_len: int, file_size: int,
+                     ocr_q: float, reason: str) -> Tuple[bool, str]:
+    """抽出結果から要確認（needs_review）かどうかと理由を判定する
+
+    抽出ループから切り出した判定表。分岐の優先順位はループ内にあった時と同じ
+    （抽出失敗 → 表形式/テキストは対象外 → 本文ほぼ空 → サイズ比で短すぎ → OCR品質）。
+    """
+    needs_rev = False
+    if method in _REVIEW_FAIL_METHODS or "missing" in method:
+        needs_rev = True
+        if not reason:
+            if "xdw_text_extractor_missing" in method:
+                if _load_xdwlib() is not None:
+                    reason = "DocuWorks Viewer Light は検出済みですが、このファイルのテキスト抽出に失敗しました（文書が保護されている可能性）"
+                else:
+                    reason = "DocuWorks Viewer Light 10 の抽出ツールが見つかりません。Viewer Light 10 本体に加え、xdw2text.exe が bin/Program 配下にあるか確認してください。見つからない場合は xdoc2txt.exe を追加してください: https://ebstudio.info/home/xdoc2txt.html"
+            elif method == "unhandled":
+                reason = f"未対応ファイル形式 ({ext})"
+            elif "pymupdf_missing" in method:
+                reason = "PyMuPDFが未インストール（pip install PyMuPDF）"
+            elif "excel_lib_missing" in method:
+                reason = "Excelライブラリが未インストール（pip install openpyxl xlrd）"
+            else:
+                reason = f"抽出失敗: {method}"
+    elif ext in _REVIEW_TEXTLIKE_EXTS:
+        pass
+    elif text_len < 30:
+        needs_rev = True
+        if ext == ".pdf" and not _ocr_available():
+            reason = "画像PDFの可能性（Tesseract OCRが未インストールのため読取不可）"
+        elif ext == ".pdf":
+            reason = "OCRを試みましたが読取できませんでした（スキャン品質が低い可能性）"
+        else:
+            reason = f"本文がほぼ空です（{text_len}文字）"
+    elif file_size > 30000 and text_len < 100:
+        needs_rev = True
+        reason = f"ファイルサイズ({file_size // 1024}KB)に対して本文が短すぎます（{text_len}文字・画像PDF等の可能性）"
+
+    # OCR品質が低い場合も要確認
+    if ocr_q < 0.35 and not needs_rev:
+        needs_rev = True
+        reason = f"OCR品質が低い（スコア: {ocr_q}）。元ファイルの目視確認を推奨"
+    return needs_rev, reason
+
+
+# 進捗コールバックの最小呼び出し間隔（秒）
+_PROGRESS_MIN_INTERVAL = 1 / 60
+
+
+def _manifest_loads(data: bytes) -> dict:
+    """マニフェスト（00_manifest.json）のバイト列を辞書に戻す"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _manifest_dumps(manifest: dict) -> bytes:
+    """マニフェストを区切り空白なし・非ASCIIそのままのUTF-8 JSONにする"""
+    if orjson is not None:
+        return orjson.dumps(manifest)
+    return json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _write_manifest(manifest_path: str, records: List[Record]) -> None:
+    """次回の差分処理のためにマニフェスト（処理キャッシュ）を保存する"""
+    # ※ needs_review=True のファイルはキャッシュに乗せない
+    #   → 次回OCRありで再処理したとき、⚠ファイルだけが自動的に再処理される
+    manifest_new: Dict[str, dict] = {"_cache_version": _CACHE_VERSION}
+    for r in records:
+        if r.sha1 and not r.needs_review:
+            # asdict() は再帰的にコピーするため遅い。フィールドはインスタンス辞書に
+            # そのまま入っているので浅いコピーで足りる（書き出し後にレコードは変更しない）
+            manifest_new[r.sha1] = r.__dict__.copy()
+    # 一時ファイルに書いてから置き換える（書き込み途中で中断されても前回のマニフェストが壊れない）
+    tmp_path = manifest_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_manifest_dumps(manifest_new))
+        os.replace(tmp_path, manifest_path)
+    except Exception:
+        # マニフェスト保存失敗は致命的ではない
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+# ファイルごとの抽出はディスク読み込みや外部プロセス（xdw2text・Tesseract）の待ちが中心なので、スレッドで並行させる
+# ※ PyMuPDF はスレッドセーフでないため、PDFは専用の1スレッドで順に処理する（OCR認識は extract_pdf 内で並行）
+# ※ DocuWorks も専用の1スレッドで順に処理する（extract_xdw は抽出ツールのパスをモジュール変数に覚えて使い回し、
+#   DocuWorks の DLL もスレッドセーフかどうか分からないため）
+_EXTRACT_WORKERS = max(1, min(8, (os.cpu_count() or 1) * 2))
+
+
+def _extract_record(path: str, rel: str, ext: str, sha1: str, st: Optional[os.stat_result],
+                    use_ocr: bool, split_re, stop_event=None) -> Optional[Tuple[Record, List[str]]]:
+    """1ファイルを抽出してレコード化し、(レコード, 処理ログの行) を返す（抽出ワーカーで実行）。
+    st は列挙時に取得済みの stat 結果（サイズ・更新日時に使う。None ならここで取得する）。
+    停止リクエスト済みなら抽出せずに None を返す。"""
+    if stop_event is not None and stop_event.is_set():
+        return None
+    text, pages, method, reason = _extract_one(path, use_ocr)
+
+    text = convert_japanese_year(text)
+    main, attach = split_main_attach(text, split_re)
+
+    # ── 文書タイプ自動判別 ──
+    doc_type = _detect_doc_type(rel, main or text)
+
+    # OCR品質スコアを計算（OCR系メソッドのみ）
+    ocr_q = 1.0
+    if "ocr" in method:
+        ocr_q = _compute_ocr_quality(text)
+
+    # 日付のみ抽出（ソート用）
+    date_guess = guess_date(text)
+    date_sort = _date_to_sort_key(date_guess)
+
+    # ファイルサイズを取得（needs_review判定で使用）
+    if st is None:
+        st = os.stat(get_safe_path(path))
+    file_size = st.st_size
+    text_len = len(main or text)
+
+    needs_rev, reason = _classify_review(method, ext, text_len, file_size, ocr_q, reason)
+
+    # ── ペイロード（NotebookLM用テキスト）──
+    # ★重要: NotebookLMに渡すテキストにはAI推定情報を入れない
+    # NotebookLMは入力ソースだけを参照するため、推定が間違っていると
+    # NotebookLMが誤情報を「事実」として引用してしまう。
+    # タイトル・日付・発出者は本文中に元々含まれているのでそのまま渡す。
+    # 見出しと本文を部品のリストに積み、最後に1回だけ連結する
+    parts = ["# 本文", main.strip()]
+    attach = attach.strip()
+    if attach:
+        parts += ("", "# 添付資料", attach)
+    payload = "\n".join(parts)
+
+    log_lines = [f"[{method}][{doc_type}] {rel}" + (f"  OCR品質:{ocr_q}" if ocr_q < 1.0 else "")]
+    if reason:
+        log_lines.append(f"  → {reason}")
+
+    record = Record(
+        relpath=rel, ext=ext,
+        size=file_size,
+        mtime=st.st_mtime,
+        sha1=sha1, method=method, pages=pages,
+        text_chars=len(text), needs_review=needs_rev, reason=reason,
+        title_guess="", date_guess=date_guess, issuer_guess="",
+        summary="", tags_facility=[], tags_work=[], tag_evidence={},
+        out_txt="", full_text_for_bind=payload,
+        doc_type=doc_type,
+        ocr_quality=ocr_q, related_laws=[], amendments=[],
+        date_sort_key=date_sort,
+    )
+    return record, log_lines
 
 
 def process_folder(indir: str, outdir: str, cfg: Dict[str, object], progress_callback: Optional[Callable[[int, int, str, str], None]] = None, stop_event=None) -> Tuple[int, int, str]:
@@ -2785,12 +3776,10 @@ def process_folder(indir: str, outdir: str, cfg: Dict[str, object], progress_cal
             try: os.remove(p)
             except Exception: pass
     # 原本コピーフォルダも再生成する（前回分を削除）
-    for _entry in os.listdir(outdir):
-        if _entry.startswith("原本コピー") and os.path.isdir(os.path.join(outdir, _entry)):
-            shutil.rmtree(os.path.join(outdir, _entry), ignore_errors=True)
+    _remove_source_copy_dirs(outdir)
 
     max_depth = int(cfg.get("max_depth", 30))
-    split_kws = list(cfg.get("main_attach_split_keywords", []))
+    split_re = _compile_split_keywords(list(cfg.get("main_attach_split_keywords", [])))
     min_chars = int(cfg.get("min_chars_mainbody", 400))
     use_ocr = bool(cfg.get("use_ocr", False))
     limit_bytes = int(cfg.get("bind_bytes_limit", 15000000))
@@ -2799,28 +3788,61 @@ def process_folder(indir: str, outdir: str, cfg: Dict[str, object], progress_cal
     SKIP_EXTENSIONS = frozenset({".db", ".tmp", ".bak", ".lnk", ".ini", ".cache"})
 
     # 【バグ修正】出力フォルダが入力フォルダ内にある場合、スキャン対象から除外する
+    # os.scandir による明示的な深さ優先探索（os.walk と同じ順序: 親フォルダのファイル →
+    # 各サブフォルダを名前の列挙順に再帰）。DirEntry の種別キャッシュで余分な stat を省き、
+    # 除外ファイル名・拡張子は列挙時点で弾く。
+    # DirEntry も残しておき、サイズ・更新日時は DirEntry.stat()（Windows は列挙時の情報、POSIX は1回だけ stat）で取る
     targets: List[str] = []
-    for root, dirs, files in os.walk(indir):
-        # 出力フォルダのサブツリーを丸ごとスキップ（dirs を in-place 変更）
-        dirs[:] = [
-            d for d in dirs
-            if os.path.abspath(os.path.join(root, d)) != outdir_abs
-        ]
-        # 深さ制限
-        rel_root = os.path.relpath(root, indir)
-        depth = 0 if rel_root == "." else rel_root.count(os.sep) + 1
-        if depth >= max_depth:
-            dirs.clear()
+    target_entries: List[os.DirEntry] = []
+    stack: List[Tuple[str, int]] = [(indir, 0)] if max_depth > 0 else []
+    while stack:
+        cur_dir, depth = stack.pop()
+        try:
+            with os.scandir(cur_dir) as it:
+                entries = list(it)
+        except OSError:
             continue
-        for fn in files:
-            if fn.lower() in SKIP_FILENAMES: continue
-            if os.path.splitext(fn)[1].lower() in SKIP_EXTENSIONS: continue
+        subdirs: List[str] = []
+        for e in entries:
+            try:
+                is_dir = e.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                # シンボリックリンク先のフォルダには入らない（os.walk の既定動作と同じ）
+                # 出力フォルダのサブツリーは丸ごとスキップ
+                if (depth + 1 < max_depth and not e.is_symlink()
+                        and os.path.abspath(e.path) != outdir_abs):
+                    subdirs.append(e.path)
+                continue
+            fn = e.name
             if fn.startswith("~$"): continue
-            targets.append(os.path.join(root, fn))
+            # 小文字化は1回だけ。拡張子は os.path.splitext を使わず最後の「.」から切り出す
+            # （先頭が「.」だけの名前は splitext と同じく拡張子なしとみなす）
+            name = fn.lower()
+            if name in SKIP_FILENAMES: continue
+            dot = name.rfind(".")
+            if dot > 0 and name[dot:] in SKIP_EXTENSIONS and name[:dot].strip("."): continue
+            targets.append(e.path)
+            target_entries.append(e)
+        stack.extend((d, depth + 1) for d in reversed(subdirs))
 
     total_files = len(targets)
+
+    # GUIへの進捗通知は約60Hzに間引く（ファイルごとに数回の再描画・スレッド間転送を避ける）
+    # ※ 最後のファイルの通知は必ず送る
+    last_progress = 0.0
+
+    def _progress(i: int, n: int, rel: str, status: str) -> None:
+        nonlocal last_progress
+        if not progress_callback:
+            return
+        now = time.monotonic()
+        if i == n or now - last_progress >= _PROGRESS_MIN_INTERVAL:
+            last_progress = now
+            progress_callback(i, n, rel, status)
     records: List[Record] = []
-    seen_sha1: set = set()
+    processed_sha1: set = set()  # レコード化済みのSHA1（重複判定はこの1つの集合で行う）
     skipped_dup = 0
     skipped_cache = 0
 
@@ -2831,232 +3853,214 @@ def process_folder(indir: str, outdir: str, cfg: Dict[str, object], progress_cal
     manifest: Dict[str, dict] = {}
     if os.path.exists(manifest_path):
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
-                manifest_raw = json.load(f)
-            # キャッシュバージョンチェック
-            if manifest_raw.get("_cache_version") == _CACHE_VERSION:
-                manifest = {k: v for k, v in manifest_raw.items() if k != "_cache_version"}
-            else:
-                manifest = {}  # バージョン不一致 → 全件再処理
+            with open(manifest_path, "rb") as f:
+                loaded = _manifest_loads(f.read())
+            # キャッシュバージョンチェック（バージョンキーを外し、読み込んだ辞書をそのまま使う）
+            # ※ フィルタ済みのコピーを作らないので、大きなマニフェストでも二重に保持しない
+            if loaded.pop("_cache_version", None) == _CACHE_VERSION:
+                manifest = loaded
+            # バージョン不一致 → 全件再処理（loaded はここで解放される）
+            del loaded
         except Exception:
             manifest = {}
 
-    log_lines: List[str] = [
-        "=== NoticeForge 処理ログ ===",
-        f"処理日時: {time.strftime('%Y年%m月%d日 %H:%M:%S')}",
-        f"入力フォルダ: {indir}",
-        f"出力フォルダ: {outdir}",
-        f"キャッシュ読込: {len(manifest)} 件",
-        "",
-        "--- 各ファイルの処理結果 ---",
-    ]
-
-    for i, path in enumerate(targets):
-        # 停止リクエストをチェック
-        if stop_event and stop_event.is_set():
-            log_lines.append("[STOPPED] ユーザーにより処理を途中で停止しました。")
-            break
+    # 前回から変わっていないファイル（相対パス・サイズ・更新日時が一致）はマニフェストのSHA1をそのまま使い、
+    # ファイル全体の読み込みとハッシュ計算を省く（stat 1回だけで済ませる）
+    rels = [os.path.relpath(p, indir) for p in targets]
+    target_stats: List[Optional[os.stat_result]] = []
+    for e in target_entries:
+        try:
+            target_stats.append(e.stat())
+        except OSError:
+            target_stats.append(None)  # 抽出時に改めて stat する
+    del target_entries
+    known_sha1: List[str] = [""] * total_files
+    if manifest:
+        fast_sha1 = {
+            (v.get("relpath"), v.get("size"), v.get("mtime")): sha1
+            for sha1, v in manifest.items() if isinstance(v, dict)
+        }
+        for i, st in enumerate(target_stats):
+            if st is not None:
+                known_sha1[i] = fast_sha1.get((rels[i], st.st_size, st.st_mtime), "")
+        del fast_sha1
+
+    # 読み込むことになる抽出ライブラリ（実際の import は各形式の初回処理時）
+    exts_present = {os.path.splitext(p)[1].lower() for p in targets}
+    extractor_libs = sorted({_EXTRACTOR_LIBS[e] for e in exts_present if e in _EXTRACTOR_LIBS})
+
+    # 処理ログは1件ごとに逐次書き出す（全行をメモリに溜めてから結合しない）
+    log_path = os.path.join(outdir, "00_処理ログ.txt")
+    with open(log_path, "w", encoding="utf-8", buffering=65536) as log_f:
+        def _log(line: str) -> None:
+            log_f.write(line)
+            log_f.write("\n")
+
+        for _line in (
+            "=== NoticeForge 処理ログ ===",
+            f"処理日時: {time.strftime('%Y年%m月%d日 %H:%M:%S')}",
+            f"入力フォルダ: {indir}",
+            f"出力フォルダ: {outdir}",
+            f"キャッシュ読込: {len(manifest)} 件",
+            f"使用する抽出ライブラリ: {'、'.join(extractor_libs) or 'なし'}",
+            "",
+            "--- 各ファイルの処理結果 ---",
+        ):
+            _log(_line)
+
+        # 第1段階（このスレッド）: SHA1・重複・キャッシュ判定をファイル順に行い、抽出が必要なものだけ抽出ワーカーへ投入する
+        # 第2段階: 抽出の完了順に進捗を通知し、全件そろったらファイル順にログ出力・レコード化する
+        # ※ 出力順（ログ・同じ日付の文書の並び）を直列処理と同じにするため、各ファイルの結果は slots に順番に積む
+        slots: List[Tuple[str, str, object]] = []  # (種別, relpath, キャッシュのレコード or 抽出の Future)
+        jobs: Dict[Future, str] = {}  # 抽出の Future → relpath
+        done = 0
+        stopped = False
+        extract_pool = ThreadPoolExecutor(max_workers=_EXTRACT_WORKERS, thread_name_prefix="extract")
+        pdf_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="extract-pdf")
+        xdw_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="extract-xdw")
+        serial_pools = {".pdf": pdf_pool, ".xdw": xdw_pool, ".xbd": xdw_pool}
+        # SHA1 はファイル順に先読みして計算しておく（1件ずつ読んで待つ直列処理にしない）
+        sha1_iter = _iter_sha1([p for p, known in zip(targets, known_sha1) if not known])
+        try:
+            for i, path in enumerate(targets):
+                # 停止リクエストをチェック
+                if stop_event and stop_event.is_set():
+                    stopped = True
+                    break
 
-        rel = os.path.relpath(path, indir)
-        ext = os.path.splitext(path)[1].lower()
-        if progress_callback: progress_callback(i + 1, total_files, rel, "(確認中...)")
+                rel = rels[i]
+                ext = os.path.splitext(path)[1].lower()
+                # 確認中のファイルは「完了済み件数 + 1」件目として表示する
+                _progress(done + 1, total_files, rel, "(確認中...)")
 
-        sha1 = compute_sha1(path)
+                sha1 = known_sha1[i] or next(sha1_iter)
 
-        # 重複ファイルチェック
-        if sha1 and sha1 in seen_sha1:
-            if progress_callback: progress_callback(i + 1, total_files, rel, "(重複・スキップ)")
-            log_lines.append(f"[重複スキップ] {rel}")
-            skipped_dup += 1
-            continue
+                # 重複ファイルチェック
+                if sha1 and sha1 in processed_sha1:
+                    done += 1
+                    _progress(done, total_files, rel, "(重複・スキップ)")
+                    slots.append(("dup", rel, None))
+                    skipped_dup += 1
+                    continue
 
-        # キャッシュヒットチェック（SHA1が一致 → 内容変更なし → 前回結果を再利用）
-        if sha1 and sha1 in manifest:
-            try:
-                cached = manifest[sha1]
-                record = Record(**{**cached, "relpath": rel, "sha1": sha1})
+                # キャッシュヒットチェック（SHA1が一致 → 内容変更なし → 前回結果を再利用）
+                if sha1 and sha1 in manifest:
+                    try:
+                        cached = manifest[sha1]
+                        record = Record(**cached)
+                        record.relpath = rel
+                        record.sha1 = sha1
+                        processed_sha1.add(sha1)
+                        done += 1
+                        _progress(done, total_files, rel, "(キャッシュ使用)")
+                        slots.append(("cache", rel, record))
+                        skipped_cache += 1
+                        continue
+                    except Exception:
+                        pass  # キャッシュが壊れていたら通常処理にフォールバック
+
+                # ここでは抽出ワーカーに積むだけ（PDF等は前のファイルの後に順番に処理される）
+                _progress(done + 1, total_files, rel, "(抽出待ち)")
+                pool = serial_pools.get(ext, extract_pool)
+                fut = pool.submit(_extract_record, path, rel, ext, sha1, target_stats[i],
+                                  use_ocr, split_re, stop_event)
+                jobs[fut] = rel
+                slots.append(("extract", rel, fut))
+                processed_sha1.add(sha1)
+            sha1_iter.close()  # 先読み中のハッシュ計算を止める（例外時は finally で閉じる）
+            # 前回のマニフェストはここから先は使わない。キャッシュとして使わなかった文書
+            # （削除・変更されたファイル）の本文まで出力処理の間ずっと保持しないよう、ここで手放す
+            # ※ キャッシュ利用のレコードは同じ値を参照しているので、そちらはそのまま残る
+            manifest.clear()
+
+            for fut in as_completed(jobs):
+                if stop_event and stop_event.is_set():
+                    # 未着手の抽出は取り消す（実行中のものは完了を待つ）
+                    for pending in jobs:
+                        pending.cancel()
+                done += 1
+                _progress(done, total_files, jobs[fut], "(抽出完了)")
+        finally:
+            sha1_iter.close()
+            extract_pool.shutdown(wait=True, cancel_futures=True)
+            pdf_pool.shutdown(wait=True, cancel_futures=True)
+            xdw_pool.shutdown(wait=True, cancel_futures=True)
+
+        for kind, rel, item in slots:
+            if kind == "dup":
+                _log(f"[重複スキップ] {rel}")
+            elif kind == "cache":
+                records.append(item)
+                _log(f"[キャッシュ] {rel}")
+            else:
+                result = None if item.cancelled() else item.result()
+                if result is None:
+                    stopped = True
+                    continue
+                record, log_lines = result
+                for _line in log_lines:
+                    _log(_line)
                 records.append(record)
-                seen_sha1.add(sha1)
-                if progress_callback: progress_callback(i + 1, total_files, rel, "(キャッシュ使用)")
-                log_lines.append(f"[キャッシュ] {rel}")
-                skipped_cache += 1
-                continue
-            except Exception:
-                pass  # キャッシュが壊れていたら通常処理にフォールバック
-
-        seen_sha1.add(sha1)
-        if progress_callback: progress_callback(i + 1, total_files, rel, "(抽出中...)")
-
-        text, method, reason, pages = "", "unhandled", "", None
+        if stopped:
+            _log("[STOPPED] ユーザーにより処理を途中で停止しました。")
+
+        # ── タイプ別＋時系列ソート（法令→通知→マニュアル、各タイプ内は日付新しい順）──
+        type_sort_order = {"法令": 0, "通知": 1, "マニュアル": 2}
+        records.sort(key=lambda r: (type_sort_order.get(r.doc_type, 9), r.date_sort_key), reverse=False)
+        # 日付は新しい順にしたいので、タイプ内で逆順にする
+        records.sort(key=lambda r: type_sort_order.get(r.doc_type, 9))
+        # タイプ別にグループ化してから日付ソート
+        sorted_records: List[Record] = []
+        for dtype in ["法令", "通知", "マニュアル"]:
+            group = [r for r in records if r.doc_type == dtype]
+            group.sort(key=lambda r: r.date_sort_key, reverse=True)
+            sorted_records.extend(group)
+        records[:] = sorted_records
+
+        # ── 出力ファイルの書き出し ──
+        # 書き出し先は互いに独立しているので、I/O中心の処理はバックグラウンドで並行させる
+        #   ・マニフェスト保存（レコードだけに依存）
+        #   ・原本PDFのコピー（バンドル数からスロット数が決まった時点で開始）
+        # ※ 以降レコードは変更しない（マニフェストは別スレッドで同じレコードを読む）
+        with ThreadPoolExecutor(max_workers=2) as writer_pool:
+            manifest_fut = writer_pool.submit(_write_manifest, manifest_path, records)
+
+            bundle_files = sorted(write_binded_texts(outdir, records, limit_bytes))
+            # 各バッチで使えるスロット数（説明文書1件 + バンドル分を除いた残り）
+            _pdf_slots = max(50 - 1 - len(bundle_files), 0)
+            copy_fut = writer_pool.submit(
+                copy_source_files_batched, indir, outdir, records, slots_per_batch=_pdf_slots
+            )
 
-        try:
-            if ext == ".pdf":
-                if use_ocr and progress_callback: progress_callback(i + 1, total_files, rel, "(OCR処理中...時間がかかります)")
-                text, pages, method = extract_pdf(path, use_ocr)
-            elif ext == ".docx":
-                text, method = extract_docx(path)
-            elif ext in (".xlsx", ".xlsm", ".xls"):
-                text, method = extract_excel(path)
-            elif ext in (".xdw", ".xbd"):
-                text, method = extract_xdw(path)
-            elif ext == ".txt":
-                text, method = extract_txt(path)
-            elif ext == ".csv":
-                text, method = extract_csv(path)
-            elif ext == ".xml":
-                text, method = extract_xml(path)
-        except Exception as e:
-            method, reason = "error", f"抽出エラー: {e.__class__.__name__}"
-
-        text = convert_japanese_year(text)
-        main, attach = split_main_attach(text, split_kws)
-
-        # ── 文書タイプ自動判別 ──
-        doc_type = _detect_doc_type(rel, main or text)
-
-        # OCR品質スコアを計算（OCR系メソッドのみ）
-        ocr_q = 1.0
-        if "ocr" in method:
-            ocr_q = _compute_ocr_quality(text)
-
-        # 日付のみ抽出（ソート用）
-        date_guess = guess_date(text)
-        date_sort = _date_to_sort_key(date_guess)
-
-        # ファイルサイズを取得（needs_review判定で使用）
-        file_size = os.path.getsize(get_safe_path(path))
-        text_len = len(main or text)
-
-        needs_rev = False
-        if method in ("unhandled", "error") or "missing" in method:
-            needs_rev = True
-            if not reason:
-                if "xdw_text_extractor_missing" in method:
-                    if XDWLIB_AVAILABLE:
-                        reason = "DocuWorks Viewer Light は検出済みですが、このファイルのテキスト抽出に失敗しました（文書が保護されている可能性）"
-                    else:
-                        reason = "DocuWorks Viewer Light 10 の抽出ツールが見つかりません。Viewer Light 10 本体に加え、xdw2text.exe が bin/Program 配下にあるか確認してください。見つからない場合は xdoc2txt.exe を追加してください: https://ebstudio.info/home/xdoc2txt.html"
-                elif method == "unhandled":
-                    reason = f"未対応ファイル形式 ({ext})"
-                elif "pymupdf_missing" in method:
-                    reason = "PyMuPDFが未インストール（pip install PyMuPDF）"
-                elif "excel_lib_missing" in method:
-                    reason = "Excelライブラリが未インストール（pip install openpyxl xlrd）"
-                else:
-                    reason = f"抽出失敗: {method}"
-        elif ext in (".xlsx", ".xlsm", ".xls", ".csv", ".txt", ".xml"):
-            pass
-        elif text_len < 30:
-            needs_rev = True
-            if ext == ".pdf" and not TESSERACT_AVAILABLE:
-                reason = "画像PDFの可能性（Tesseract OCRが未インストールのため読取不可）"
-            elif ext == ".pdf":
-                reason = "OCRを試みましたが読取できませんでした（スキャン品質が低い可能性）"
-            else:
-                reason = f"本文がほぼ空です（{text_len}文字）"
-        elif file_size > 30000 and text_len < 100:
-            needs_rev = True
-            reason = f"ファイルサイズ({file_size // 1024}KB)に対して本文が短すぎます（{text_len}文字・画像PDF等の可能性）"
-
-        # OCR品質が低い場合も要確認
-        if ocr_q < 0.35 and not needs_rev:
-            needs_rev = True
-            reason = f"OCR品質が低い（スコア: {ocr_q}）。元ファイルの目視確認を推奨"
-
-        # ── ペイロード（NotebookLM用テキスト）──
-        # ★重要: NotebookLMに渡すテキストにはAI推定情報を入れない
-        # NotebookLMは入力ソースだけを参照するため、推定が間違っていると
-        # NotebookLMが誤情報を「事実」として引用してしまう。
-        # タイトル・日付・発出者は本文中に元々含まれているのでそのまま渡す。
-        payload = f"# 本文\n{main.strip()}"
-        if attach.strip():
-            payload += f"\n\n# 添付資料\n{attach.strip()}"
-
-        log_lines.append(f"[{method}][{doc_type}] {rel}" + (f"  OCR品質:{ocr_q}" if ocr_q < 1.0 else ""))
-        if reason:
-            log_lines.append(f"  → {reason}")
-
-        records.append(Record(
-            relpath=rel, ext=ext,
-            size=file_size,
-            mtime=os.path.getmtime(get_safe_path(path)),
-            sha1=sha1, method=method, pages=pages,
-            text_chars=len(text), needs_review=needs_rev, reason=reason,
-            title_guess="", date_guess=date_guess, issuer_guess="",
-            summary="", tags_facility=[], tags_work=[], tag_evidence={},
-            out_txt="", full_text_for_bind=payload,
-            doc_type=doc_type,
-            ocr_quality=ocr_q, related_laws=[], amendments=[],
-            date_sort_key=date_sort,
-        ))
-
-    # ── タイプ別＋時系列ソート（法令→通知→マニュアル、各タイプ内は日付新しい順）──
-    type_sort_order = {"法令": 0, "通知": 1, "マニュアル": 2}
-    records.sort(key=lambda r: (type_sort_order.get(r.doc_type, 9), r.date_sort_key), reverse=False)
-    # 日付は新しい順にしたいので、タイプ内で逆順にする
-    records.sort(key=lambda r: type_sort_order.get(r.doc_type, 9))
-    # タイプ別にグループ化してから日付ソート
-    sorted_records: List[Record] = []
-    for dtype in ["法令", "通知", "マニュアル"]:
-        group = [r for r in records if r.doc_type == dtype]
-        group.sort(key=lambda r: r.date_sort_key, reverse=True)
-        sorted_records.extend(group)
-    records[:] = sorted_records
-
-    write_binded_texts(outdir, records, limit_bytes)
-
-    # 原本PDFをコピーし、説明文書・投入ガイドを生成する
-    import glob as _glob
-    bundle_files = sorted(_glob.glob(os.path.join(outdir, "NotebookLM用_*.txt")))
-    # 各バッチで使えるスロット数（説明文書1件 + バンドル分を除いた残り）
-    _pdf_slots = max(50 - 1 - len(bundle_files), 0)
-    batches, skipped_files = copy_source_files_batched(indir, outdir, records, slots_per_batch=_pdf_slots)
-    all_copied = [f for _, files in batches for f in files]
-    write_notebook_preamble(outdir, records, bundle_files, all_copied)
-    write_upload_guide(outdir, bundle_files, batches, skipped_files)
-
-    # サマリーを集計してログファイルに保存
-    needs_rev_count = len([r for r in records if r.needs_review])
-    review_breakdown: Dict[str, int] = {}
-    for r in records:
-        if r.needs_review:
+            # サマリーを集計してログファイルに保存
+            needs_rev_count = len([r for r in records if r.needs_review])
             # 理由の先頭部分（40文字まで）をキーにして集計
-            key = r.reason[:40] if r.reason else r.method
-            review_breakdown[key] = review_breakdown.get(key, 0) + 1
-
-    # 文書タイプ別集計
-    dtype_log: Dict[str, int] = {}
-    for r in records:
-        dtype_log[r.doc_type] = dtype_log.get(r.doc_type, 0) + 1
-
-    log_lines += [
-        "",
-        "--- サマリー ---",
-        f"総処理数: {len(records)} 件（うちキャッシュ利用: {skipped_cache} 件）",
-        f"文書タイプ別: " + " / ".join(f"{k}: {v}件" for k, v in dtype_log.items()),
-        f"正常抽出: {len(records) - needs_rev_count} 件",
-        f"要確認: {needs_rev_count} 件",
-    ]
-    for k, v in sorted(review_breakdown.items(), key=lambda x: -x[1]):
-        log_lines.append(f"  ・{k}: {v} 件")
-    if skipped_dup:
-        log_lines.append(f"重複スキップ: {skipped_dup} 件")
-
-    with open(os.path.join(outdir, "00_処理ログ.txt"), "w", encoding="utf-8") as f:
-        f.write("\n".join(log_lines))
-
-    # マニフェストを更新（次回の差分処理のために全レコードを保存）
-    # ※ needs_review=True のファイルはキャッシュに乗せない
-    #   → 次回OCRありで再処理したとき、⚠ファイルだけが自動的に再処理される
-    manifest_new: Dict[str, dict] = {"_cache_version": _CACHE_VERSION}
-    for r in records:
-        if r.sha1 and not r.needs_review:
-            manifest_new[r.sha1] = asdict(r)
-    try:
-        with open(manifest_path, "w", encoding="utf-8") as f:
-            json.dump(manifest_new, f, ensure_ascii=False, separators=(",", ":"))
-    except Exception:
-        pass  # マニフェスト保存失敗は致命的ではない
+            review_breakdown = Counter(
+                r.reason[:40] if r.reason else r.method for r in records if r.needs_review)
+
+            # 文書タイプ別集計
+            dtype_log = Counter(r.doc_type for r in records)
+
+            for _line in (
+                "",
+                "--- サマリー ---",
+                f"総処理数: {len(records)} 件（うちキャッシュ利用: {skipped_cache} 件）",
+                f"文書タイプ別: " + " / ".join(f"{k}: {v}件" for k, v in dtype_log.items()),
+                f"正常抽出: {len(records) - needs_rev_count} 件",
+                f"要確認: {needs_rev_count} 件",
+            ):
+                _log(_line)
+            for k, v in sorted(review_breakdown.items(), key=lambda x: -x[1]):
+                _log(f"  ・{k}: {v} 件")
+            if skipped_dup:
+                _log(f"重複スキップ: {skipped_dup} 件")
+
+            # 原本PDFのコピー完了を待ってから、説明文書・投入ガイドを生成する
+            batches, skipped_files = copy_fut.result()
+            all_copied = [f for _, files, _ in batches for f in files]
+            write_notebook_preamble(outdir, records, bundle_files, all_copied)
+            write_upload_guide(outdir, bundle_files, batches, skipped_files)
+            manifest_fut.result()
 
     breakdown_str = "　".join(f"{k}: {v}件" for k, v in sorted(review_breakdown.items(), key=lambda x: -x[1]))
     return len(records), needs_rev_count, breakdown_str